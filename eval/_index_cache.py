@@ -0,0 +1,74 @@
+"""
+Shared on-disk cache of the parsed cloud-skills index for the eval scripts.
+
+setup_baseline.py and run_eval.py both read the same index.json. The first
+read stores the parsed dict in a binary copy under eval/.index_cache/
+(msgpack when installed, marshal otherwise, neither of which runs code on
+load); later reads load that instead of re-parsing JSON, as long as the copy
+is newer than index.json. Nothing is written next to index.json itself.
+"""
+
+import hashlib
+import json
+import marshal
+import os
+from pathlib import Path
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+CACHE_DIR = Path(__file__).resolve().parent / ".index_cache"
+
+
+def _cache_path(path: Path) -> Path:
+    """One cache file per index.json, named after its resolved path."""
+    digest = hashlib.sha1(str(path.resolve()).encode("utf-8")).hexdigest()[:16]
+    suffix = ".msgpack" if msgpack else ".marshal"
+    return CACHE_DIR / f"{path.stem}-{digest}{suffix}"
+
+
+def _dumps(data: dict) -> bytes:
+    if msgpack:
+        return msgpack.packb(data)
+    return marshal.dumps(data)
+
+
+def _loads(raw: bytes) -> dict:
+    if msgpack:
+        return msgpack.unpackb(raw)
+    return marshal.loads(raw)
+
+
+def load_index_cached(path: Path, use_cache: bool = True) -> dict:
+    """
+    Load index.json, via the binary cache when it is fresh.
+    With use_cache=False the JSON is always parsed and the cache is left alone.
+    A cache that cannot be read or written is ignored.
+    """
+    path = Path(path)
+    if not use_cache:
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    cache = _cache_path(path)
+    try:
+        if os.path.getmtime(cache) >= os.path.getmtime(path):
+            data = _loads(cache.read_bytes())
+            if isinstance(data, dict):
+                return data
+    except Exception:
+        pass  # missing, from another Python version, or corrupt: fall back to JSON
+
+    data = json.loads(path.read_text(encoding="utf-8"))
+    tmp = cache.with_name(f"{cache.name}.{os.getpid()}.tmp")
+    try:
+        CACHE_DIR.mkdir(exist_ok=True)
+        tmp.write_bytes(_dumps(data))
+        os.replace(tmp, cache)
+    except (OSError, ValueError, TypeError):
+        try:
+            tmp.unlink()
+        except OSError:
+            pass  # read-only location: just skip caching
+    return data
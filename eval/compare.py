@@ -14,20 +14,37 @@ Usage:
     python compare.py [--index PATH] [--verbose] [--save]
 """
 
+import functools
 import json
 import re
+import statistics
 import sys
 import time
 import argparse
+from array import array
 from pathlib import Path
-from collections import defaultdict
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from typing import NamedTuple, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# RE2 (linear-time, no backtracking) when installed, else the stdlib engine
+try:
+    import re2 as _re_engine
+except ImportError:
+    _re_engine = re
 
 # Add scripts dir to path
 SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
 sys.path.insert(0, str(SCRIPTS_DIR))
 
 from config import TRIGGER_THRESHOLD
-from matcher import match_skills, select_best, detect_language, tokenize_en
+from matcher import match_skills, select_best, detect_language
 
 EVAL_DIR = Path(__file__).resolve().parent
 TEST_CASES_PATH = EVAL_DIR / "test_cases.json"
@@ -37,66 +54,196 @@ DEFAULT_INDEX = Path(__file__).resolve().parent.parent.parent / "cloud-skills" /
 CONTEXT_WINDOW = 128000
 BUDGET_CHARS = int(CONTEXT_WINDOW * 0.02)
 
+# English tokens (same as matcher.tokenize_en) or runs of Chinese characters,
+# so one pass over lowercased text yields both. The CJK range is written as
+# literal characters (not raw \u escapes) so RE2 can compile it too.
+_TOKEN_RE = _re_engine.compile('([a-z][a-z0-9\\-]*)|([\u4e00-\u9fff]+)')
+
+# Stop words ignored by the baseline word-overlap scorer
+_STOP_WORDS = frozenset({
+    "a", "an", "the", "is", "are", "was", "were", "be", "been",
+    "being", "have", "has", "had", "do", "does", "did", "will",
+    "would", "could", "should", "may", "might", "can", "shall",
+    "to", "of", "in", "for", "on", "with", "at", "by", "from",
+    "as", "into", "through", "during", "before", "after", "and",
+    "but", "or", "not", "so", "both", "either", "each", "every",
+    "all", "any", "few", "more", "most", "other", "some", "such",
+    "no", "only", "own", "same", "than", "too", "very", "just",
+    "that", "this", "it", "its", "how", "what", "which", "my",
+    "your", "our", "their", "you", "me", "us", "them", "i", "we",
+})
+
 
 # ──────────────────────────────────────────────
 #  方案B: Baseline matching (description only)
 # ──────────────────────────────────────────────
 
-def select_within_budget(skills: list, budget_chars: int = BUDGET_CHARS) -> list:
-    """Select skills that fit within the description budget, shortest first."""
-    def desc_line(s):
-        name = s.get("display_name", s["name"])
-        desc = s.get("short_description", "")
-        return f"{name}: {desc}"
+def _desc_line_len(skill: dict) -> int:
+    """Length of the "name: description" line Claude would see for a skill."""
+    name = skill.get("display_name", skill["name"])
+    desc = skill.get("short_description", "")
+    return len(str(name)) + 2 + len(str(desc))  # as f"{name}: {desc}" renders None
+
 
-    entries = [(s, desc_line(s)) for s in skills]
-    entries.sort(key=lambda e: len(e[1]))
+def select_within_budget(
+    skills: list,
+    budget_chars: int = BUDGET_CHARS,
+    line_lengths: Optional[list] = None,
+) -> list:
+    """
+    Select skills that fit within the description budget, shortest first.
+    line_lengths: optional precomputed _desc_line_len() per skill, same order.
+    """
+    if line_lengths is None:
+        line_lengths = [_desc_line_len(s) for s in skills]
+    keyed = sorted(zip(line_lengths, skills), key=lambda e: e[0])
 
     visible = []
     cumulative = 0
-    for skill, line in entries:
-        cumulative += len(line)
-        if cumulative <= budget_chars:
-            visible.append(skill)
-        # Once over budget, all remaining are hidden
+    for length, skill in keyed:
+        cumulative += length
+        if cumulative > budget_chars:
+            break  # Once over budget, all remaining are hidden
+        visible.append(skill)
 
     return visible
 
 
-def baseline_word_overlap(prompt: str, name: str, description: str) -> float:
+def _scan(text_lower: str) -> tuple:
+    """Split lowercased text into (english_words, chinese_runs) in a single pass."""
+    words = []
+    zh = []
+    for en, cjk in _TOKEN_RE.findall(text_lower):
+        if en:
+            words.append(en)
+        else:
+            zh.append(cjk)
+    return words, zh
+
+
+def _prep_prompt(prompt: str) -> tuple:
     """
-    Score a skill against a prompt using only name + description word overlap.
-    This simulates Claude's best-case matching with limited information.
-    No trigger_keywords, no intent_patterns, no negative_keywords.
-    Returns 0-100 score.
+    Preprocess a prompt once for scoring against many skills.
+    Returns (prompt_lower, prompt_words, zh_chars_in_prompt, prompt_prefix5,
+    prompt_no_space), stop words removed.
     """
     prompt_lower = prompt.lower()
-    prompt_words = set(tokenize_en(prompt))
-
     # Also extract Chinese characters as substrings
-    zh_chars_in_prompt = re.findall(r'[\u4e00-\u9fff]+', prompt_lower)
+    words, zh_chars_in_prompt = _scan(prompt_lower)
+    prompt_words = set(words)
+    prompt_words -= _STOP_WORDS
+
+    # 5-char prefixes of long prompt words, for the prefix-match fallback
+    prompt_prefix5 = {pw[:5] for pw in prompt_words if len(pw) >= 6}
+
+    return (
+        prompt_lower, prompt_words, zh_chars_in_prompt, prompt_prefix5,
+        prompt_lower.replace(" ", ""),
+    )
+
+
+@functools.lru_cache(maxsize=4096)
+def _skill_tokens(text_lower: str) -> tuple:
+    """
+    Memoized (words_without_stop_words, chinese_runs) for skill text.
+    Skill names/descriptions repeat across calls, e.g. when
+    baseline_word_overlap() is used directly without a preindex.
+    """
+    words, zh = _scan(text_lower)
+    return frozenset(words) - _STOP_WORDS, tuple(zh)
+
+
+def _index_skill(skill: dict) -> dict:
+    """Precompute the prompt-independent search data for one skill."""
+    name = skill["name"]
+    description = skill.get("short_description", "")
 
     # Build searchable text from name + description
-    search_text = f"{name} {description}".lower()
-    search_words = set(tokenize_en(search_text))
-    zh_chars_in_search = re.findall(r'[\u4e00-\u9fff]+', search_text)
-
-    # Stop words to ignore
-    stop_words = {
-        "a", "an", "the", "is", "are", "was", "were", "be", "been",
-        "being", "have", "has", "had", "do", "does", "did", "will",
-        "would", "could", "should", "may", "might", "can", "shall",
-        "to", "of", "in", "for", "on", "with", "at", "by", "from",
-        "as", "into", "through", "during", "before", "after", "and",
-        "but", "or", "not", "so", "both", "either", "each", "every",
-        "all", "any", "few", "more", "most", "other", "some", "such",
-        "no", "only", "own", "same", "than", "too", "very", "just",
-        "that", "this", "it", "its", "how", "what", "which", "my",
-        "your", "our", "their", "you", "me", "us", "them", "i", "we",
+    search_words, zh_chars_in_search = _skill_tokens(f"{name} {description}".lower())
+
+    name_lower = name.lower()
+    name_words = _skill_tokens(name_lower)[0]
+
+    return {
+        "skill": skill,
+        "name": name,
+        "search_words": search_words,
+        "zh": zh_chars_in_search,
+        "prefix5": {sw[:5] for sw in search_words if len(sw) >= 6},
+        "name_words": name_words,
+        "name_dash_space": name_lower.replace("-", " "),
+        "name_no_dash": name_lower.replace("-", ""),
     }
 
-    prompt_words -= stop_words
-    search_words -= stop_words
+
+def _preindex_skills(skills: list) -> dict:
+    """
+    Precompute search data for every skill, once per evaluation, plus
+    inverted indexes (word / prefix / Chinese substring / squashed name ->
+    entry positions) used to find candidate skills for a prompt.
+    """
+    entries = [_index_skill(s) for s in skills]
+    words = defaultdict(list)
+    prefixes = defaultdict(list)
+    zh_runs = defaultdict(list)
+    names = defaultdict(list)
+
+    for i, entry in enumerate(entries):
+        for w in entry["search_words"]:
+            words[w].append(i)
+        for p in entry["prefix5"]:
+            prefixes[p].append(i)
+        for zh in set(entry["zh"]):
+            zh_runs[zh].append(i)
+        # Both name-boost substring checks imply this squashed form is in the
+        # space-stripped prompt, so it is a safe superset key.
+        names[entry["name_no_dash"].replace(" ", "")].append(i)
+
+    return {
+        "entries": entries,
+        "words": dict(words),
+        "prefix5": dict(prefixes),
+        "zh": dict(zh_runs),
+        "zh_lengths": sorted({len(zh) for zh in zh_runs}),
+        "names": dict(names),
+        "name_lengths": sorted({len(n) for n in names}),
+    }
+
+
+def _substring_hits(text: str, index: dict, lengths: list, hits: set):
+    """Add entry positions for every index key that occurs as a substring of text."""
+    for length in lengths:
+        for i in range(len(text) - length + 1):
+            found = index.get(text[i:i + length])
+            if found:
+                hits.update(found)
+
+
+def _candidates(prep: tuple, preindex: dict) -> list:
+    """
+    Positions of skills that can score above 0 for a prepared prompt:
+    those sharing a word, 5-char prefix, Chinese substring or name with it.
+    """
+    prompt_lower, prompt_words, zh_chars_in_prompt, prompt_prefix5, prompt_no_space = prep
+    hits = set()
+    for w in prompt_words:
+        hits.update(preindex["words"].get(w, ()))
+    for p in prompt_prefix5:
+        hits.update(preindex["prefix5"].get(p, ()))
+    # Chinese keys are pure CJK runs, so they can only occur inside a prompt run
+    for zh in zh_chars_in_prompt:
+        _substring_hits(zh, preindex["zh"], preindex["zh_lengths"], hits)
+    _substring_hits(
+        prompt_no_space, preindex["names"], preindex["name_lengths"], hits,
+    )
+    return sorted(hits)
+
+
+def _score_skill(prep: tuple, entry: dict) -> float:
+    """Score a preindexed skill against a prompt prepared by _prep_prompt."""
+    prompt_lower, prompt_words, _, prompt_prefix5, prompt_no_space = prep
+    search_words = entry["search_words"]
+    zh_chars_in_search = entry["zh"]
 
     if not search_words and not zh_chars_in_search:
         return 0.0
@@ -106,12 +253,9 @@ def baseline_word_overlap(prompt: str, name: str, description: str) -> float:
     for sw in search_words:
         if sw in prompt_words:
             overlap += 1
-        elif len(sw) >= 6:
+        elif len(sw) >= 6 and sw[:5] in prompt_prefix5:
             # Simple prefix match
-            for pw in prompt_words:
-                if len(pw) >= 6 and sw[:5] == pw[:5]:
-                    overlap += 0.5
-                    break
+            overlap += 0.5
 
     # Chinese substring overlap (check if Chinese in name/desc appears in prompt)
     zh_overlap = 0
@@ -128,38 +272,56 @@ def baseline_word_overlap(prompt: str, name: str, description: str) -> float:
     # Normalize: more overlap = higher score
     ratio = total_overlap / total_searchable
     # Boost if skill name directly appears in prompt
-    name_words = set(tokenize_en(name))
-    name_words -= stop_words
+    name_words = entry["name_words"]
     if name_words and name_words.issubset(prompt_words):
         ratio = min(ratio + 0.4, 1.0)
-    elif name.lower().replace("-", " ") in prompt_lower:
+    elif entry["name_dash_space"] in prompt_lower:
         ratio = min(ratio + 0.3, 1.0)
-    elif name.lower().replace("-", "") in prompt_lower.replace(" ", ""):
+    elif entry["name_no_dash"] in prompt_no_space:
         ratio = min(ratio + 0.2, 1.0)
 
     return ratio * 100
 
 
-def baseline_match(prompt: str, skills: list, budget_chars: int = BUDGET_CHARS) -> dict:
+def baseline_word_overlap(prompt: str, name: str, description: str) -> float:
+    """
+    Score a skill against a prompt using only name + description word overlap.
+    This simulates Claude's best-case matching with limited information.
+    No trigger_keywords, no intent_patterns, no negative_keywords.
+    Returns 0-100 score.
+    """
+    entry = _index_skill({"name": name, "short_description": description})
+    return _score_skill(_prep_prompt(prompt), entry)
+
+
+def baseline_match(
+    prompt: str,
+    skills: list,
+    budget_chars: int = BUDGET_CHARS,
+    visible_skills: Optional[list] = None,
+    preindex: Optional[dict] = None,
+) -> dict:
     """
     方案B matching: description-based word overlap, budget-limited.
     Returns dict with matched skill name, score, and visibility info.
+
+    visible_skills / preindex: optional select_within_budget() and
+    _preindex_skills() outputs, so repeated calls over the same skill
+    list skip re-selecting and re-tokenizing them.
     """
-    visible_skills = select_within_budget(skills, budget_chars)
+    if visible_skills is None:
+        visible_skills = select_within_budget(skills, budget_chars)
     visible_names = {s["name"] for s in visible_skills}
+    if preindex is None:
+        preindex = _preindex_skills(visible_skills)
 
-    best_name = None
-    best_score = 0.0
-
-    for skill in visible_skills:
-        name = skill["name"]
-        display_name = skill.get("display_name", name)
-        desc = skill.get("short_description", "")
-        score = baseline_word_overlap(prompt, name, desc)
-
-        if score > best_score:
-            best_score = score
-            best_name = name
+    prep = _prep_prompt(prompt)
+    entries = preindex["entries"]
+    scored = [
+        (entries[i]["name"], _score_skill(prep, entries[i]))
+        for i in _candidates(prep, preindex)
+    ]
+    best_name, best_score = max(scored, key=lambda e: e[1], default=(None, 0.0))
 
     # Require a minimum threshold to avoid matching everything
     baseline_threshold = 15.0
@@ -182,23 +344,25 @@ def baseline_match(prompt: str, skills: list, budget_chars: int = BUDGET_CHARS)
 
 def plan_a_match(prompt: str, skills: list) -> dict:
     """方案A matching: full skill-router with all features."""
-    start = time.perf_counter()
+    start = time.perf_counter_ns()
     ranked = match_skills(prompt, skills)
     result = select_best(ranked)
-    elapsed_ms = (time.perf_counter() - start) * 1000
+    elapsed_ns = time.perf_counter_ns() - start
 
     if result is None:
         return {
             "matched": None,
             "score": 0,
-            "latency_ms": elapsed_ms,
+            "latency_ms": elapsed_ns / 1e6,
+            "latency_ns": elapsed_ns,
         }
 
     skill, score, is_ambiguous = result
     return {
         "matched": skill["name"],
         "score": round(score, 1),
-        "latency_ms": elapsed_ms,
+        "latency_ms": elapsed_ns / 1e6,
+        "latency_ns": elapsed_ns,
     }
 
 
@@ -206,139 +370,220 @@ def plan_a_match(prompt: str, skills: list) -> dict:
 #  Evaluation logic
 # ──────────────────────────────────────────────
 
-def evaluate_comparison(test_cases: list, skills: list, verbose: bool = False) -> dict:
-    """Run both approaches on all test cases and compute comparison metrics."""
-    results = []
+class PlanResult(NamedTuple):
+    """One approach's result for a test case."""
+    matched: Optional[str]
+    score: float
+    correct: bool
+    invisible: bool = False  # expected skill hidden by the budget (方案B only)
+
+
+class CaseResult(NamedTuple):
+    """Both approaches' results for a test case."""
+    id: int
+    type: str
+    prompt: str
+    expected: Optional[str]
+    expected_alt: Optional[str]
+    plan_a: PlanResult
+    plan_b: PlanResult
+    status: str
+    notes: str
+
+
+def case_result_to_dict(case: CaseResult) -> dict:
+    """Convert a CaseResult to the plain dict layout used in saved JSON."""
+    plan_a = case.plan_a._asdict()
+    del plan_a["invisible"]  # only meaningful for 方案B
+    return {**case._asdict(), "plan_a": plan_a, "plan_b": case.plan_b._asdict()}
+
+
+def _classify(
+    tc_type: str,
+    matched: Optional[str],
+    expected: Optional[str],
+    expected_alt: Optional[str],
+    invisible: bool = False,
+) -> tuple:
+    """
+    Classify one plan's result for a test case.
+    Returns (outcome, correct), where outcome is the tally cell to count
+    (tp/fp/fn/tn or confusion_*), or None for boundary/unknown types.
+    An invisible expected skill can never be matched (方案B only).
+    """
+    if tc_type == "positive":
+        if invisible:
+            return "fn", False
+        if matched == expected:
+            return "tp", True
+        if matched is None:
+            return "fn", False
+        return "fp", False
+    if tc_type == "negative":
+        if matched is None:
+            return "tn", True
+        return "fp", False
+    if tc_type == "confusion":
+        if invisible:
+            return "confusion_none", False
+        if matched == expected:
+            return "confusion_correct", True
+        if matched == expected_alt:
+            return "confusion_alt", True
+        if matched is None:
+            return "confusion_none", False
+        return "confusion_wrong", False
+    if tc_type == "boundary":
+        return None, not invisible and matched == expected
+    return None, False
+
+
+def _eval_case(
+    tc: dict,
+    skills: list,
+    visible_skills: list,
+    visible_names: set,
+    visible_index: dict,
+) -> tuple:
+    """
+    Run both approaches on one test case.
+    Returns (CaseResult, outcomes, latency_ns), where outcomes are the
+    (plan, outcome) pairs to tally for this case.
+    """
+    tc_id = tc["id"]
+    prompt = tc["prompt"]
+    expected = tc.get("expected")
+    expected_alt = tc.get("expected_alt")
+    tc_type = tc["type"]
+
+    # Run both
+    ra = plan_a_match(prompt, skills)
+    rb = baseline_match(
+        prompt, skills, visible_skills=visible_skills, preindex=visible_index,
+    )
+
+    # Check if expected skill is invisible in 方案B
+    is_invisible = expected is not None and expected not in visible_names
 
-    # 方案A counters
-    a_tp = a_fp = a_fn = a_tn = 0
-    a_confusion_correct = a_confusion_alt = a_confusion_wrong = a_confusion_none = 0
+    a_outcome, a_correct = _classify(tc_type, ra["matched"], expected, expected_alt)
+    b_outcome, b_correct = _classify(
+        tc_type, rb["matched"], expected, expected_alt, invisible=is_invisible,
+    )
+    outcomes = [("a", a_outcome), ("b", b_outcome)]
+    if is_invisible and tc_type in ("positive", "confusion", "boundary"):
+        # expected skill was hidden (outside budget)
+        outcomes.append(("b", "invisible_miss"))
+
+    # Determine status label for display
+    if a_correct and b_correct:
+        status = "BOTH OK"
+    elif a_correct and not b_correct:
+        status = "A WINS"
+    elif not a_correct and b_correct:
+        status = "B WINS"
+    else:
+        status = "BOTH FAIL"
+
+    entry = CaseResult(
+        id=tc_id,
+        type=tc_type,
+        prompt=prompt,
+        expected=expected,
+        expected_alt=expected_alt,
+        plan_a=PlanResult(ra["matched"], ra["score"], a_correct),
+        plan_b=PlanResult(rb["matched"], rb["score"], b_correct, is_invisible),
+        status=status,
+        notes=tc.get("notes", ""),
+    )
+    return entry, outcomes, ra["latency_ns"]
 
-    # 方案B counters
-    b_tp = b_fp = b_fn = b_tn = 0
-    b_confusion_correct = b_confusion_alt = b_confusion_wrong = b_confusion_none = 0
-    b_invisible_miss = 0  # expected skill was hidden (outside budget)
 
-    # Pre-compute visible skills for 方案B
+# Per-process state for parallel runs, set once by _init_worker so the
+# skill list is pickled once per worker rather than once per test case.
+_WORKER_STATE = {}
+
+
+def _init_worker(skills: list):
     visible_skills = select_within_budget(skills)
-    visible_names = {s["name"] for s in visible_skills}
+    _WORKER_STATE.update(
+        skills=skills,
+        visible_skills=visible_skills,
+        visible_names={s["name"] for s in visible_skills},
+        visible_index=_preindex_skills(visible_skills),
+    )
 
-    latencies_a = []
-
-    for tc in test_cases:
-        tc_id = tc["id"]
-        prompt = tc["prompt"]
-        expected = tc.get("expected")
-        expected_alt = tc.get("expected_alt")
-        tc_type = tc["type"]
-
-        # Run both
-        ra = plan_a_match(prompt, skills)
-        rb = baseline_match(prompt, skills)
-        latencies_a.append(ra["latency_ms"])
-
-        # Check if expected skill is invisible in 方案B
-        is_invisible = expected is not None and expected not in visible_names
-
-        # --- 方案A correctness ---
-        a_correct = False
-        if tc_type == "positive":
-            if ra["matched"] == expected:
-                a_tp += 1; a_correct = True
-            elif ra["matched"] is None:
-                a_fn += 1
-            else:
-                a_fp += 1
-        elif tc_type == "negative":
-            if ra["matched"] is None:
-                a_tn += 1; a_correct = True
-            else:
-                a_fp += 1
-        elif tc_type == "confusion":
-            if ra["matched"] == expected:
-                a_confusion_correct += 1; a_correct = True
-            elif ra["matched"] == expected_alt:
-                a_confusion_alt += 1; a_correct = True
-            elif ra["matched"] is None:
-                a_confusion_none += 1
-            else:
-                a_confusion_wrong += 1
-        elif tc_type == "boundary":
-            if ra["matched"] == expected:
-                a_correct = True
-
-        # --- 方案B correctness ---
-        b_correct = False
-        if tc_type == "positive":
-            if is_invisible:
-                b_invisible_miss += 1
-                b_fn += 1
-            elif rb["matched"] == expected:
-                b_tp += 1; b_correct = True
-            elif rb["matched"] is None:
-                b_fn += 1
-            else:
-                b_fp += 1
-        elif tc_type == "negative":
-            if rb["matched"] is None:
-                b_tn += 1; b_correct = True
-            else:
-                b_fp += 1
-        elif tc_type == "confusion":
-            if is_invisible:
-                b_invisible_miss += 1
-                b_confusion_none += 1
-            elif rb["matched"] == expected:
-                b_confusion_correct += 1; b_correct = True
-            elif rb["matched"] == expected_alt:
-                b_confusion_alt += 1; b_correct = True
-            elif rb["matched"] is None:
-                b_confusion_none += 1
-            else:
-                b_confusion_wrong += 1
-        elif tc_type == "boundary":
-            if is_invisible:
-                b_invisible_miss += 1
-            elif rb["matched"] == expected:
-                b_correct = True
-
-        # Determine status label for display
-        if a_correct and b_correct:
-            status = "BOTH OK"
-        elif a_correct and not b_correct:
-            status = "A WINS"
-        elif not a_correct and b_correct:
-            status = "B WINS"
-        else:
-            status = "BOTH FAIL"
-
-        entry = {
-            "id": tc_id,
-            "type": tc_type,
-            "prompt": prompt,
-            "expected": expected,
-            "expected_alt": expected_alt,
-            "plan_a": {"matched": ra["matched"], "score": ra["score"], "correct": a_correct},
-            "plan_b": {"matched": rb["matched"], "score": rb["score"], "correct": b_correct,
-                       "invisible": is_invisible},
-            "status": status,
-            "notes": tc.get("notes", ""),
-        }
-        results.append(entry)
 
-        if verbose:
-            prompt_short = prompt[:50] + ("..." if len(prompt) > 50 else "")
-            print(f"  [{status:9s}] #{tc_id:3d} ({tc_type:10s}) \"{prompt_short}\"")
-            if status != "BOTH OK":
-                print(f"       A: {ra['matched']} (score={ra['score']})")
-                b_note = " [INVISIBLE]" if is_invisible else ""
-                print(f"       B: {rb['matched']} (score={rb['score']}){b_note}")
+def _eval_case_in_worker(tc: dict) -> tuple:
+    return _eval_case(tc, **_WORKER_STATE)
+
+
+def evaluate_comparison(
+    test_cases: list,
+    skills: list,
+    verbose: bool = False,
+    workers: int = 1,
+) -> dict:
+    """
+    Run both approaches on all test cases and compute comparison metrics.
+    Returns {"metrics": dict, "results": [CaseResult, ...]}.
+    With workers > 1, test cases are spread over a process pool; 方案A
+    latencies are then measured under concurrent load.
+    """
+    results = []
+    tally = []  # (plan, outcome) per case, counted once after the loop
+
+    # Pre-compute visible skills for 方案B
+    line_lengths = [_desc_line_len(s) for s in skills]
+    visible_skills = select_within_budget(skills, line_lengths=line_lengths)
+    visible_names = {s["name"] for s in visible_skills}
+    visible_index = _preindex_skills(visible_skills)
+
+    # Flat, preallocated int64 buffer of nanoseconds: one slot per test case,
+    # no boxed floats; converted to ms once when computing metrics
+    latencies_ns = array("q", [0]) * len(test_cases)
+
+    with ExitStack() as stack:
+        if workers > 1:
+            pool = stack.enter_context(ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker, initargs=(skills,),
+            ))
+            case_results = pool.map(_eval_case_in_worker, test_cases, chunksize=8)
+        else:
+            case_results = (
+                _eval_case(tc, skills, visible_skills, visible_names, visible_index)
+                for tc in test_cases
+            )
+
+        for i, (entry, outcomes, latency_ns) in enumerate(case_results):
+            results.append(entry)
+            tally.extend(outcomes)
+            latencies_ns[i] = latency_ns
+
+            if verbose:
+                status = entry.status
+                prompt = entry.prompt
+                ra = entry.plan_a
+                rb = entry.plan_b
+                prompt_short = prompt[:50] + ("..." if len(prompt) > 50 else "")
+                print(f"  [{status:9s}] #{entry.id:3d} ({entry.type:10s}) \"{prompt_short}\"")
+                if status != "BOTH OK":
+                    print(f"       A: {ra.matched} (score={ra.score})")
+                    b_note = " [INVISIBLE]" if rb.invisible else ""
+                    print(f"       B: {rb.matched} (score={rb.score}){b_note}")
 
     # Compute metrics
-    positive_count = sum(1 for tc in test_cases if tc["type"] == "positive")
-    negative_count = sum(1 for tc in test_cases if tc["type"] == "negative")
-    confusion_count = sum(1 for tc in test_cases if tc["type"] == "confusion")
-    boundary_count = sum(1 for tc in test_cases if tc["type"] == "boundary")
+    counts = Counter(tally)
+    a_tp, a_fp, a_fn, a_tn = (counts["a", k] for k in ("tp", "fp", "fn", "tn"))
+    b_tp, b_fp, b_fn, b_tn = (counts["b", k] for k in ("tp", "fp", "fn", "tn"))
+    a_confusion_wrong = counts["a", "confusion_wrong"]
+    b_confusion_wrong = counts["b", "confusion_wrong"]
+    b_invisible_miss = counts["b", "invisible_miss"]
+
+    type_counts = Counter(tc["type"] for tc in test_cases)
+    positive_count = type_counts["positive"]
+    negative_count = type_counts["negative"]
+    confusion_count = type_counts["confusion"]
+    boundary_count = type_counts["boundary"]
 
     # 方案A metrics
     a_precision = a_tp / (a_tp + a_fp) * 100 if (a_tp + a_fp) > 0 else 0
@@ -356,13 +601,9 @@ def evaluate_comparison(test_cases: list, skills: list, verbose: bool = False) -
 
     # Token cost estimation
     avg_a_tokens = 487  # Average injection cost from token_analysis
-    b_idle_tokens = sum(
-        len(f"{s.get('display_name', s['name'])}: {s.get('short_description', '')}") // 4
-        for s in skills
-    )
+    b_idle_tokens = sum(length // 4 for length in line_lengths)
 
-    n = len(latencies_a)
-    latencies_sorted = sorted(latencies_a)
+    status_counts = Counter(r.status for r in results)
 
     metrics = {
         "plan_a": {
@@ -375,12 +616,12 @@ def evaluate_comparison(test_cases: list, skills: list, verbose: bool = False) -
             "avg_token_cost": avg_a_tokens,
             "tp": a_tp, "fp": a_fp, "fn": a_fn, "tn": a_tn,
             "confusion": {
-                "correct": a_confusion_correct,
-                "alt": a_confusion_alt,
+                "correct": counts["a", "confusion_correct"],
+                "alt": counts["a", "confusion_alt"],
                 "wrong": a_confusion_wrong,
-                "none": a_confusion_none,
+                "none": counts["a", "confusion_none"],
             },
-            "latency_p50": round(latencies_sorted[n // 2], 1) if n > 0 else 0,
+            "latency_p50": round(statistics.median_high(latencies_ns) / 1e6, 1) if latencies_ns else 0,
         },
         "plan_b": {
             "precision": round(b_precision, 1),
@@ -392,10 +633,10 @@ def evaluate_comparison(test_cases: list, skills: list, verbose: bool = False) -
             "avg_token_cost": b_idle_tokens,
             "tp": b_tp, "fp": b_fp, "fn": b_fn, "tn": b_tn,
             "confusion": {
-                "correct": b_confusion_correct,
-                "alt": b_confusion_alt,
+                "correct": counts["b", "confusion_correct"],
+                "alt": counts["b", "confusion_alt"],
                 "wrong": b_confusion_wrong,
-                "none": b_confusion_none,
+                "none": counts["b", "confusion_none"],
             },
             "invisible_misses": b_invisible_miss,
         },
@@ -407,10 +648,10 @@ def evaluate_comparison(test_cases: list, skills: list, verbose: bool = False) -
             "boundary": boundary_count,
         },
         "win_counts": {
-            "a_wins": sum(1 for r in results if r["status"] == "A WINS"),
-            "b_wins": sum(1 for r in results if r["status"] == "B WINS"),
-            "both_ok": sum(1 for r in results if r["status"] == "BOTH OK"),
-            "both_fail": sum(1 for r in results if r["status"] == "BOTH FAIL"),
+            "a_wins": status_counts["A WINS"],
+            "b_wins": status_counts["B WINS"],
+            "both_ok": status_counts["BOTH OK"],
+            "both_fail": status_counts["BOTH FAIL"],
         },
     }
 
@@ -424,91 +665,110 @@ def print_comparison_report(data: dict):
     a = m["plan_a"]
     b = m["plan_b"]
     w = m["win_counts"]
+    out = []  # report lines, written to stdout in one call at the end
 
-    print()
-    print("=" * 64)
-    print("  SKILL-ROUTER vs BASELINE COMPARISON REPORT")
-    print("=" * 64)
+    out.append("")
+    out.append("=" * 64)
+    out.append("  SKILL-ROUTER vs BASELINE COMPARISON REPORT")
+    out.append("=" * 64)
 
-    print(f"\n  Test Cases: {m['summary']['total_cases']}")
-    print(f"    Positive: {m['summary']['positive']} | Negative: {m['summary']['negative']} "
-          f"| Confusion: {m['summary']['confusion']} | Boundary: {m['summary']['boundary']}")
+    out.append(f"\n  Test Cases: {m['summary']['total_cases']}")
+    out.append(f"    Positive: {m['summary']['positive']} | Negative: {m['summary']['negative']} "
+               f"| Confusion: {m['summary']['confusion']} | Boundary: {m['summary']['boundary']}")
 
     # Main comparison table
-    print(f"\n{'─' * 64}")
-    print(f"  {'Metric':30s} {'方案A':>10s}  {'方案B':>10s}  {'差异':>10s}")
-    print(f"  {'':30s} {'(router)':>10s}  {'(baseline)':>10s}  {'':>10s}")
-    print(f"{'─' * 64}")
+    out.append(f"\n{'─' * 64}")
+    out.append(f"  {'Metric':30s} {'方案A':>10s}  {'方案B':>10s}  {'差异':>10s}")
+    out.append(f"  {'':30s} {'(router)':>10s}  {'(baseline)':>10s}  {'':>10s}")
+    out.append(f"{'─' * 64}")
 
     def diff_str(va, vb, suffix="", higher_better=True):
         d = va - vb
         sign = "+" if d > 0 else ""
         return f"{sign}{d:.1f}{suffix}" if d != 0 else "="
 
-    print(f"  {'Coverage (routable)':30s} {a['coverage']:>10d}  {b['coverage']:>10d}  {'+' + str(a['coverage'] - b['coverage']):>10s}")
-    print(f"  {'Precision':30s} {a['precision']:>9.1f}%  {b['precision']:>9.1f}%  {diff_str(a['precision'], b['precision'], '%'):>10s}")
-    print(f"  {'Recall':30s} {a['recall']:>9.1f}%  {b['recall']:>9.1f}%  {diff_str(a['recall'], b['recall'], '%'):>10s}")
-    print(f"  {'F1 Score':30s} {a['f1']:>9.1f}%  {b['f1']:>9.1f}%  {diff_str(a['f1'], b['f1'], '%'):>10s}")
-    print(f"  {'Confusion Rate':30s} {a['confusion_rate']:>9.1f}%  {b['confusion_rate']:>9.1f}%  {diff_str(a['confusion_rate'], b['confusion_rate'], '%', higher_better=False):>10s}")
-    print(f"  {'Invisible Miss Rate':30s} {a['invisible_miss_rate']:>9.1f}%  {b['invisible_miss_rate']:>9.1f}%  {diff_str(a['invisible_miss_rate'], b['invisible_miss_rate'], '%', higher_better=False):>10s}")
-    print(f"  {'Avg Token Cost':30s} {a['avg_token_cost']:>10d}  {b['avg_token_cost']:>10d}  {'-' + str(b['avg_token_cost'] - a['avg_token_cost']):>10s}")
+    out.append(f"  {'Coverage (routable)':30s} {a['coverage']:>10d}  {b['coverage']:>10d}  {'+' + str(a['coverage'] - b['coverage']):>10s}")
+    out.append(f"  {'Precision':30s} {a['precision']:>9.1f}%  {b['precision']:>9.1f}%  {diff_str(a['precision'], b['precision'], '%'):>10s}")
+    out.append(f"  {'Recall':30s} {a['recall']:>9.1f}%  {b['recall']:>9.1f}%  {diff_str(a['recall'], b['recall'], '%'):>10s}")
+    out.append(f"  {'F1 Score':30s} {a['f1']:>9.1f}%  {b['f1']:>9.1f}%  {diff_str(a['f1'], b['f1'], '%'):>10s}")
+    out.append(f"  {'Confusion Rate':30s} {a['confusion_rate']:>9.1f}%  {b['confusion_rate']:>9.1f}%  {diff_str(a['confusion_rate'], b['confusion_rate'], '%', higher_better=False):>10s}")
+    out.append(f"  {'Invisible Miss Rate':30s} {a['invisible_miss_rate']:>9.1f}%  {b['invisible_miss_rate']:>9.1f}%  {diff_str(a['invisible_miss_rate'], b['invisible_miss_rate'], '%', higher_better=False):>10s}")
+    out.append(f"  {'Avg Token Cost':30s} {a['avg_token_cost']:>10d}  {b['avg_token_cost']:>10d}  {'-' + str(b['avg_token_cost'] - a['avg_token_cost']):>10s}")
 
     # Win/loss summary
-    print(f"\n{'─' * 64}")
-    print(f"  Win/Loss Summary")
-    print(f"{'─' * 64}")
-    print(f"  方案A wins:     {w['a_wins']:3d} cases")
-    print(f"  方案B wins:     {w['b_wins']:3d} cases")
-    print(f"  Both correct:   {w['both_ok']:3d} cases")
-    print(f"  Both wrong:     {w['both_fail']:3d} cases")
+    out.append(f"\n{'─' * 64}")
+    out.append(f"  Win/Loss Summary")
+    out.append(f"{'─' * 64}")
+    out.append(f"  方案A wins:     {w['a_wins']:3d} cases")
+    out.append(f"  方案B wins:     {w['b_wins']:3d} cases")
+    out.append(f"  Both correct:   {w['both_ok']:3d} cases")
+    out.append(f"  Both wrong:     {w['both_fail']:3d} cases")
 
     # Detailed confusion analysis
-    print(f"\n{'─' * 64}")
-    print(f"  Confusion Case Breakdown")
-    print(f"{'─' * 64}")
-    print(f"  {'':20s} {'方案A':>8s}  {'方案B':>8s}")
-    print(f"  {'Correct (primary)':20s} {a['confusion']['correct']:>8d}  {b['confusion']['correct']:>8d}")
-    print(f"  {'Correct (alt)':20s} {a['confusion']['alt']:>8d}  {b['confusion']['alt']:>8d}")
-    print(f"  {'Wrong match':20s} {a['confusion']['wrong']:>8d}  {b['confusion']['wrong']:>8d}")
-    print(f"  {'No match':20s} {a['confusion']['none']:>8d}  {b['confusion']['none']:>8d}")
+    out.append(f"\n{'─' * 64}")
+    out.append(f"  Confusion Case Breakdown")
+    out.append(f"{'─' * 64}")
+    out.append(f"  {'':20s} {'方案A':>8s}  {'方案B':>8s}")
+    out.append(f"  {'Correct (primary)':20s} {a['confusion']['correct']:>8d}  {b['confusion']['correct']:>8d}")
+    out.append(f"  {'Correct (alt)':20s} {a['confusion']['alt']:>8d}  {b['confusion']['alt']:>8d}")
+    out.append(f"  {'Wrong match':20s} {a['confusion']['wrong']:>8d}  {b['confusion']['wrong']:>8d}")
+    out.append(f"  {'No match':20s} {a['confusion']['none']:>8d}  {b['confusion']['none']:>8d}")
 
     # Per-case comparison (differences only, or all if verbose)
-    diff_results = [r for r in results if r["status"] in ("A WINS", "B WINS")]
-    print(f"\n{'─' * 64}")
-    print(f"  Case-by-Case Differences ({len(diff_results)} cases)")
-    print(f"{'─' * 64}")
+    diff_results = [r for r in results if r.status in ("A WINS", "B WINS")]
+    out.append(f"\n{'─' * 64}")
+    out.append(f"  Case-by-Case Differences ({len(diff_results)} cases)")
+    out.append(f"{'─' * 64}")
 
     for r in diff_results:
-        prompt_short = r["prompt"][:55] + ("..." if len(r["prompt"]) > 55 else "")
-        print(f"\n  #{r['id']:3d} [{r['status']}] ({r['type']})")
-        print(f"       \"{prompt_short}\"")
-        print(f"       Expected: {r['expected']}")
+        prompt_short = r.prompt[:55] + ("..." if len(r.prompt) > 55 else "")
+        out.append(f"\n  #{r.id:3d} [{r.status}] ({r.type})")
+        out.append(f"       \"{prompt_short}\"")
+        out.append(f"       Expected: {r.expected}")
 
-        ra = r["plan_a"]
-        rb = r["plan_b"]
-        a_mark = "OK" if ra["correct"] else "FAIL"
-        b_mark = "OK" if rb["correct"] else "FAIL"
-        inv = " [INVISIBLE]" if rb.get("invisible") else ""
+        ra = r.plan_a
+        rb = r.plan_b
+        a_mark = "OK" if ra.correct else "FAIL"
+        b_mark = "OK" if rb.correct else "FAIL"
+        inv = " [INVISIBLE]" if rb.invisible else ""
 
-        print(f"       方案A: {ra['matched'] or '(none)':25s} (score={ra['score']:5.1f}) [{a_mark}]")
-        print(f"       方案B: {(rb['matched'] or '(none)'):25s} (score={rb['score']:5.1f}) [{b_mark}]{inv}")
+        out.append(f"       方案A: {ra.matched or '(none)':25s} (score={ra.score:5.1f}) [{a_mark}]")
+        out.append(f"       方案B: {(rb.matched or '(none)'):25s} (score={rb.score:5.1f}) [{b_mark}]{inv}")
 
     # Summary verdict
-    print(f"\n{'=' * 64}")
+    out.append(f"\n{'=' * 64}")
     if w['a_wins'] > w['b_wins']:
         advantage = w['a_wins'] - w['b_wins']
-        print(f"  VERDICT: 方案A (skill-router) wins by {advantage} cases")
-        print(f"  Key advantages:")
-        print(f"    - {a['coverage'] - b['coverage']} more skills routable (no budget limit)")
-        print(f"    - {b['invisible_miss_rate']:.1f}% invisible miss rate eliminated")
-        print(f"    - {b['avg_token_cost'] - a['avg_token_cost']:,} fewer tokens per turn")
+        out.append(f"  VERDICT: 方案A (skill-router) wins by {advantage} cases")
+        out.append(f"  Key advantages:")
+        out.append(f"    - {a['coverage'] - b['coverage']} more skills routable (no budget limit)")
+        out.append(f"    - {b['invisible_miss_rate']:.1f}% invisible miss rate eliminated")
+        out.append(f"    - {b['avg_token_cost'] - a['avg_token_cost']:,} fewer tokens per turn")
         if a['precision'] > b['precision']:
-            print(f"    - {a['precision'] - b['precision']:.1f}% higher precision (negative keywords)")
+            out.append(f"    - {a['precision'] - b['precision']:.1f}% higher precision (negative keywords)")
     elif w['b_wins'] > w['a_wins']:
-        print(f"  VERDICT: 方案B (baseline) wins by {w['b_wins'] - w['a_wins']} cases")
+        out.append(f"  VERDICT: 方案B (baseline) wins by {w['b_wins'] - w['a_wins']} cases")
+    else:
+        out.append(f"  VERDICT: Both approaches tie on case wins")
+    out.append("=" * 64)
+
+    sys.stdout.write("\n".join(out) + "\n")
+
+
+def _read_json(path: Path):
+    """Parse a UTF-8 JSON file, using orjson when it is installed."""
+    raw = path.read_bytes()
+    if orjson:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _write_json(path: Path, data):
+    """Write data as indented UTF-8 JSON, using orjson when it is installed."""
+    if orjson:
+        path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
     else:
-        print(f"  VERDICT: Both approaches tie on case wins")
-    print("=" * 64)
+        path.write_bytes(json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8"))
 
 
 def main():
@@ -516,14 +776,16 @@ def main():
     parser.add_argument("--index", type=str, default=str(DEFAULT_INDEX), help="Path to index.json")
     parser.add_argument("--verbose", "-v", action="store_true", help="Print each test case")
     parser.add_argument("--save", "-s", action="store_true", help="Save results to JSON")
+    parser.add_argument("--workers", "-j", type=int, default=1,
+                        help="Worker processes for test cases (latencies are noisier above 1)")
     args = parser.parse_args()
 
     print("Loading test cases...")
-    test_cases = json.loads(TEST_CASES_PATH.read_text(encoding="utf-8"))["test_cases"]
+    test_cases = _read_json(TEST_CASES_PATH)["test_cases"]
     print(f"  {len(test_cases)} test cases loaded")
 
     print("Loading index...")
-    index = json.loads(Path(args.index).read_text(encoding="utf-8"))
+    index = _read_json(Path(args.index))
     skills = index.get("skills", [])
     print(f"  {len(skills)} skills in index")
 
@@ -532,7 +794,7 @@ def main():
     print(f"\n  方案B budget: {BUDGET_CHARS:,} chars ({len(visible)}/{len(skills)} skills visible)")
 
     print(f"\nRunning comparison evaluation...")
-    data = evaluate_comparison(test_cases, skills, verbose=args.verbose)
+    data = evaluate_comparison(test_cases, skills, verbose=args.verbose, workers=args.workers)
 
     print_comparison_report(data)
 
@@ -540,10 +802,10 @@ def main():
         RESULTS_DIR.mkdir(parents=True, exist_ok=True)
         timestamp = time.strftime("%Y%m%d_%H%M%S")
         result_path = RESULTS_DIR / f"comparison_{timestamp}.json"
-        result_path.write_text(
-            json.dumps(data, indent=2, ensure_ascii=False),
-            encoding="utf-8",
-        )
+        _write_json(result_path, {
+            "metrics": data["metrics"],
+            "results": [case_result_to_dict(r) for r in data["results"]],
+        })
         print(f"\nResults saved to {result_path}")
 
 
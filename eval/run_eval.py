@@ -4,22 +4,46 @@ Computes precision, recall, false positive rate, confusion rate, and latency.
 
 Usage:
     python run_eval.py [--index PATH] [--verbose]
+    python run_eval.py [--index PATH] [--save] sweep 12 15 18 21
 """
 
+import functools
+import gzip
 import json
 import os
+import pickle
 import sys
 import time
 import argparse
 from pathlib import Path
-from collections import defaultdict
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from itertools import repeat
+from typing import NamedTuple, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 # Add scripts dir to path
 SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
 sys.path.insert(0, str(SCRIPTS_DIR))
 
 from config import TRIGGER_THRESHOLD
-from matcher import match_skills, select_best, detect_language
+from matcher import match_skills, select_best, detect_language, prepare_prompt
+from _index_cache import load_index_cached
 
 EVAL_DIR = Path(__file__).resolve().parent
 TEST_CASES_PATH = EVAL_DIR / "test_cases.json"
@@ -29,129 +53,214 @@ RESULTS_DIR = EVAL_DIR / "results"
 DEFAULT_INDEX = Path(__file__).resolve().parent.parent.parent / "cloud-skills" / "index.json"
 
 
-def load_test_cases() -> list:
-    return json.loads(TEST_CASES_PATH.read_text(encoding="utf-8"))["test_cases"]
-
-
-def load_index(path: Path) -> dict:
-    return json.loads(path.read_text(encoding="utf-8"))
+class _Case(NamedTuple):
+    """A test case with its optional fields defaulted, read once at load time."""
+    id: int
+    prompt: str
+    type: str
+    expected: Optional[str]
+    expected_alt: Optional[str]
+    category: str
+    notes: str
+
+    @classmethod
+    def from_dict(cls, tc: dict) -> "_Case":
+        return cls(
+            tc["id"], tc["prompt"], tc["type"], tc.get("expected"), tc.get("expected_alt"),
+            tc.get("category", "unknown"), tc.get("notes", ""),
+        )
 
 
-def run_single(prompt: str, skills: list) -> dict:
-    """Run matching for a single prompt, return result with timing."""
+def load_test_cases() -> list:
+    raw = json.loads(TEST_CASES_PATH.read_text(encoding="utf-8"))["test_cases"]
+    return [_Case.from_dict(tc) for tc in raw]
+
+
+def load_index(path: Path, use_cache: bool = True) -> dict:
+    """Parse index.json, via the on-disk cache shared with setup_baseline unless use_cache is off."""
+    return load_index_cached(path, use_cache)
+
+
+@functools.lru_cache(maxsize=8)
+def _cached_load_index(path_str: str, mtime: float) -> dict:
+    return load_index(Path(path_str))
+
+
+def load_index_memoized(path: Path) -> dict:
+    """
+    load_index memoized on (path, mtime), so in-process callers such as
+    threshold sweeps parse the index once. Callers must not mutate the result.
+    """
+    return _cached_load_index(str(path), os.path.getmtime(path))
+
+
+@functools.lru_cache(maxsize=4096)
+def _cached_prepare(prompt: str):
+    """Memoized prompt preprocessing; test prompts repeat across evaluate() runs."""
+    return prepare_prompt(prompt)
+
+
+class MatchResult(NamedTuple):
+    """Outcome of matching one prompt; all_matches is empty unless requested."""
+    matched: Optional[str]
+    score: float
+    is_ambiguous: bool
+    runner_up: Optional[str]
+    runner_up_score: float
+    all_matches: list
+    latency_ms: float
+
+
+def run_single(
+    prompt: str,
+    skills: list,
+    use_cache: bool = True,
+    top_matches: bool = True,
+    threshold: float = TRIGGER_THRESHOLD,
+) -> MatchResult:
+    """
+    Run matching for a single prompt, return result with timing.
+    With use_cache, prompt preprocessing comes from the memo cache and is
+    excluded from the timing; otherwise it is timed as part of matching.
+    The top-5 (name, score) list is only built when top_matches is set.
+    """
+    prepared = _cached_prepare(prompt) if use_cache else None
     start = time.perf_counter()
-    ranked = match_skills(prompt, skills)
+    ranked = match_skills(prompt, skills, prepared, threshold)
     result = select_best(ranked)
     elapsed_ms = (time.perf_counter() - start) * 1000
 
     if result is None:
-        return {
-            "matched": None,
-            "score": 0,
-            "is_ambiguous": False,
-            "runner_up": None,
-            "runner_up_score": 0,
-            "all_matches": [],
-            "latency_ms": elapsed_ms,
-        }
+        return MatchResult(None, 0, False, None, 0, [], elapsed_ms)
 
     best_skill, score, is_ambiguous = result
     runner_up = ranked[1] if len(ranked) > 1 else None
 
-    return {
-        "matched": best_skill["name"],
-        "score": score,
-        "is_ambiguous": is_ambiguous,
-        "runner_up": runner_up[0]["name"] if runner_up else None,
-        "runner_up_score": runner_up[1] if runner_up else 0,
-        "all_matches": [(s["name"], sc) for s, sc in ranked[:5]],
-        "latency_ms": elapsed_ms,
-    }
-
-
-def evaluate(test_cases: list, skills: list, verbose: bool = False) -> dict:
-    """Run all test cases and compute metrics."""
-    results = []
-    latencies = []
-
-    # Counters
-    tp = 0  # true positive: expected match, correct match
-    fp = 0  # false positive: expected no match, but matched something
-    fn = 0  # false negative: expected match, but no match
-    tn = 0  # true negative: expected no match, no match
-
-    confusion_correct = 0  # confusion cases where primary expected matched
-    confusion_alt = 0      # confusion cases where alt expected matched
-    confusion_wrong = 0    # confusion cases where wrong skill matched
-    confusion_none = 0     # confusion cases where nothing matched
+    return MatchResult(
+        matched=best_skill["name"],
+        score=score,
+        is_ambiguous=is_ambiguous,
+        runner_up=runner_up[0]["name"] if runner_up else None,
+        runner_up_score=runner_up[1] if runner_up else 0,
+        all_matches=[(s["name"], sc) for s, sc in ranked[:5]] if top_matches else [],
+        latency_ms=elapsed_ms,
+    )
+
+
+# Per-process state for parallel runs, set once by _init_worker so the skill
+# list is pickled once per worker rather than once per test case.
+_WORKER_STATE = {}
+
+
+def _init_worker(skills: list, use_cache: bool, top_matches: bool):
+    _WORKER_STATE.update(skills=skills, use_cache=use_cache, top_matches=top_matches)
+
+
+def _run_single_in_worker(prompt: str, threshold: float) -> MatchResult:
+    return run_single(prompt, threshold=threshold, **_WORKER_STATE)
+
+
+def make_pool(jobs: int, skills: list, use_cache: bool = True, verbose: bool = False):
+    """Process pool whose workers hold skills, reusable across evaluate() calls."""
+    return ProcessPoolExecutor(
+        max_workers=jobs, initializer=_init_worker, initargs=(skills, use_cache, verbose),
+    )
+
+
+def _order_stats(values, ranks: list) -> list:
+    """
+    Return the values at the given ranks of sorted(values), i.e. nearest-rank
+    percentiles. Uses numpy's O(n) partition when available, else one sort.
+    """
+    if np is not None:
+        part = np.partition(np.asarray(values, dtype=np.float64), ranks)
+        return [float(part[r]) for r in ranks]
+    ordered = sorted(values)
+    return [ordered[r] for r in ranks]
+
+
+def _classify(
+    tc_type: str,
+    matched: Optional[str],
+    expected: Optional[str],
+    expected_alt: Optional[str],
+) -> tuple:
+    """
+    Classify one result for a test case.
+    Returns (outcome, correct), where outcome is one of correct/alt/none/wrong
+    for the tally, or None for unknown types. Negative cases are "correct"
+    when nothing matched and "wrong" otherwise.
+    """
+    if tc_type == "negative":
+        return ("correct", True) if matched is None else ("wrong", False)
+    if tc_type not in ("positive", "confusion", "boundary"):
+        return None, matched == expected
+    if matched == expected:
+        return "correct", True
+    if tc_type == "confusion" and matched == expected_alt:
+        return "alt", True  # acceptable
+    if matched is None:
+        return "none", False
+    return "wrong", False
+
+
+def evaluate(
+    test_cases: list,
+    skills: list,
+    verbose: bool = False,
+    jobs: int = 1,
+    use_cache: bool = True,
+    threshold: float = TRIGGER_THRESHOLD,
+    pool: Optional[ProcessPoolExecutor] = None,
+) -> dict:
+    """
+    Run all test cases and compute metrics.
+    With jobs > 1, matching runs in a process pool and results are
+    classified in test-case order; latencies are then measured under load.
+    An existing pool from make_pool(jobs, skills, ...) may be passed
+    to reuse its workers. Top matches are only printed for verbose
+    failures, so they are only collected when verbose.
+    """
+    # Accept raw test-case dicts from in-process callers too
+    test_cases = [tc if isinstance(tc, _Case) else _Case.from_dict(tc) for tc in test_cases]
+
+    if pool is not None or jobs > 1:
+        prompts = [tc.prompt for tc in test_cases]
+        with ExitStack() as stack:
+            if pool is None:
+                pool = stack.enter_context(make_pool(jobs, skills, use_cache, verbose))
+            chunksize = max(1, len(prompts) // (4 * max(1, jobs)))
+            match_results = list(
+                pool.map(_run_single_in_worker, prompts, repeat(threshold), chunksize=chunksize)
+            )
+    else:
+        # Lazy, so verbose output still streams as each case runs
+        match_results = (
+            run_single(tc.prompt, skills, use_cache, verbose, threshold) for tc in test_cases
+        )
 
-    boundary_correct = 0
-    boundary_wrong = 0
-    boundary_none = 0
+    results = [None] * len(test_cases)
+    latencies = [0.0] * len(test_cases)
 
-    category_results = defaultdict(lambda: {"tp": 0, "fp": 0, "fn": 0})
+    # Tallies keyed by (type, outcome) and, for positive cases, (category, outcome);
+    # Counters so per-worker tallies could simply be summed
+    counts = Counter()
+    category_counts = Counter()
+    type_counts = defaultdict(int)
 
-    for tc in test_cases:
-        tc_id = tc["id"]
-        prompt = tc["prompt"]
-        expected = tc.get("expected")
-        expected_alt = tc.get("expected_alt")
-        tc_type = tc["type"]
+    for i, (tc, result) in enumerate(zip(test_cases, match_results)):
+        tc_id, prompt, tc_type, expected, expected_alt, category, notes = tc
 
-        result = run_single(prompt, skills)
-        matched = result["matched"]
-        latencies.append(result["latency_ms"])
+        matched = result.matched
+        latencies[i] = result.latency_ms
+        type_counts[tc_type] += 1
 
         # Determine correctness
-        if tc_type == "positive":
-            if matched == expected:
-                tp += 1
-                correct = True
-                category_results[tc.get("category", "unknown")]["tp"] += 1
-            elif matched is None:
-                fn += 1
-                correct = False
-                category_results[tc.get("category", "unknown")]["fn"] += 1
-            else:
-                fp += 1
-                correct = False
-                category_results[tc.get("category", "unknown")]["fp"] += 1
-
-        elif tc_type == "negative":
-            if matched is None:
-                tn += 1
-                correct = True
-            else:
-                fp += 1
-                correct = False
-
-        elif tc_type == "confusion":
-            if matched == expected:
-                confusion_correct += 1
-                correct = True
-            elif matched == expected_alt:
-                confusion_alt += 1
-                correct = True  # acceptable
-            elif matched is None:
-                confusion_none += 1
-                correct = False
-            else:
-                confusion_wrong += 1
-                correct = False
-
-        elif tc_type == "boundary":
-            if matched == expected:
-                boundary_correct += 1
-                correct = True
-            elif matched is None:
-                boundary_none += 1
-                correct = False
-            else:
-                boundary_wrong += 1
-                correct = False
-
-        else:
-            correct = matched == expected
+        outcome, correct = _classify(tc_type, matched, expected, expected_alt)
+        if outcome is not None:
+            counts[tc_type, outcome] += 1
+            if tc_type == "positive":
+                category_counts[category, outcome] += 1
 
         entry = {
             "id": tc_id,
@@ -159,33 +268,55 @@ def evaluate(test_cases: list, skills: list, verbose: bool = False) -> dict:
             "prompt": prompt[:80],
             "expected": expected,
             "matched": matched,
-            "score": round(result["score"], 1),
+            "score": round(result.score, 1),
             "correct": correct,
-            "is_ambiguous": result["is_ambiguous"],
-            "runner_up": result["runner_up"],
-            "latency_ms": round(result["latency_ms"], 1),
-            "notes": tc.get("notes", ""),
+            "is_ambiguous": result.is_ambiguous,
+            "runner_up": result.runner_up,
+            "latency_ms": round(result.latency_ms, 1),
+            "notes": notes,
         }
-        results.append(entry)
+        results[i] = entry
 
         if verbose:
             status = "OK" if correct else "FAIL"
             print(f"  [{status}] #{tc_id} ({tc_type}) \"{prompt[:50]}...\"")
             if not correct:
-                print(f"       expected={expected}, got={matched} (score={result['score']:.1f})")
-                if result["all_matches"]:
-                    top3 = result["all_matches"][:3]
+                print(f"       expected={expected}, got={matched} (score={result.score:.1f})")
+                if result.all_matches:
+                    top3 = result.all_matches[:3]
                     print(f"       top matches: {top3}")
 
     # Compute metrics
-    latencies_sorted = sorted(latencies)
-    n = len(latencies_sorted)
+    n = len(latencies)
+    p50, p95, p99 = (
+        _order_stats(latencies, [n // 2, int(n * 0.95), int(n * 0.99)]) if n > 0 else (0, 0, 0)
+    )
+
+    tp = counts["positive", "correct"]   # true positive: expected match, correct match
+    fn = counts["positive", "none"]      # false negative: expected match, but no match
+    tn = counts["negative", "correct"]   # true negative: expected no match, no match
+    neg_false_positive = counts["negative", "wrong"]  # negative cases that wrongly triggered
+    # false positive: matched the wrong skill, or matched anything on a negative case
+    fp = counts["positive", "wrong"] + neg_false_positive
+
+    confusion_correct = counts["confusion", "correct"]  # primary expected matched
+    confusion_alt = counts["confusion", "alt"]          # alt expected matched
+    confusion_wrong = counts["confusion", "wrong"]      # wrong skill matched
+    confusion_none = counts["confusion", "none"]        # nothing matched
+
+    boundary_correct = counts["boundary", "correct"]
+    boundary_wrong = counts["boundary", "wrong"]
+    boundary_none = counts["boundary", "none"]
+
+    category_results = defaultdict(lambda: {"tp": 0, "fp": 0, "fn": 0})
+    for (cat, outcome), count in category_counts.items():
+        category_results[cat][{"correct": "tp", "none": "fn", "wrong": "fp"}[outcome]] += count
 
     # Positive test metrics
-    positive_count = sum(1 for tc in test_cases if tc["type"] == "positive")
-    negative_count = sum(1 for tc in test_cases if tc["type"] == "negative")
-    confusion_count = sum(1 for tc in test_cases if tc["type"] == "confusion")
-    boundary_count = sum(1 for tc in test_cases if tc["type"] == "boundary")
+    positive_count = type_counts["positive"]
+    negative_count = type_counts["negative"]
+    confusion_count = type_counts["confusion"]
+    boundary_count = type_counts["boundary"]
 
     precision = tp / (tp + fp) if (tp + fp) > 0 else 0
     recall = tp / (tp + fn) if (tp + fn) > 0 else 0
@@ -211,11 +342,11 @@ def evaluate(test_cases: list, skills: list, verbose: bool = False) -> dict:
         "positive_results": {
             "true_positive": tp,
             "false_negative": fn,
-            "wrong_match": fp - (sum(1 for tc in test_cases if tc["type"] == "negative") - tn),
+            "wrong_match": fp - neg_false_positive,
         },
         "negative_results": {
             "true_negative": tn,
-            "false_positive": sum(1 for r in results if r["type"] == "negative" and not r["correct"]),
+            "false_positive": neg_false_positive,
         },
         "confusion_results": {
             "correct_primary": confusion_correct,
@@ -235,9 +366,9 @@ def evaluate(test_cases: list, skills: list, verbose: bool = False) -> dict:
             ) if boundary_count > 0 else 0,
         },
         "latency": {
-            "p50_ms": round(latencies_sorted[n // 2], 1) if n > 0 else 0,
-            "p95_ms": round(latencies_sorted[int(n * 0.95)] if n > 0 else 0, 1),
-            "p99_ms": round(latencies_sorted[int(n * 0.99)] if n > 0 else 0, 1),
+            "p50_ms": round(p50, 1),
+            "p95_ms": round(p95, 1),
+            "p99_ms": round(p99, 1),
             "max_ms": round(max(latencies) if latencies else 0, 1),
             "mean_ms": round(sum(latencies) / n if n > 0 else 0, 1),
         },
@@ -248,103 +379,177 @@ def evaluate(test_cases: list, skills: list, verbose: bool = False) -> dict:
             }
             for cat, v in sorted(category_results.items())
         },
-        "threshold_used": TRIGGER_THRESHOLD,
+        "threshold_used": threshold,
     }
 
     return {"metrics": metrics, "results": results}
 
 
-def print_report(metrics: dict):
-    """Print a formatted evaluation report."""
+def print_report(metrics: dict, stream=None):
+    """Print a formatted evaluation report to stream (stdout by default) in one write."""
     m = metrics
-    print("\n" + "=" * 60)
-    print("  SKILL-ROUTER EVALUATION REPORT")
-    print("=" * 60)
-
-    print(f"\nTest Cases: {m['summary']['total_cases']}")
-    print(f"  Positive: {m['summary']['positive_cases']} | "
-          f"Negative: {m['summary']['negative_cases']} | "
-          f"Confusion: {m['summary']['confusion_cases']} | "
-          f"Boundary: {m['summary']['boundary_cases']}")
-
-    print(f"\n--- Core Metrics ---")
-    print(f"  Precision:          {m['accuracy']['precision']}%")
-    print(f"  Recall:             {m['accuracy']['recall']}%")
-    print(f"  F1 Score:           {m['accuracy']['f1_score']}%")
-    print(f"  False Positive Rate:{m['accuracy']['false_positive_rate']}%")
-    print(f"  Confusion Rate:     {m['accuracy']['confusion_rate']}%")
-
-    print(f"\n--- Positive Cases (should trigger correct skill) ---")
+    out = []  # report lines, written in one call at the end
+    out.append("\n" + "=" * 60)
+    out.append("  SKILL-ROUTER EVALUATION REPORT")
+    out.append("=" * 60)
+
+    out.append(f"\nTest Cases: {m['summary']['total_cases']}")
+    out.append(f"  Positive: {m['summary']['positive_cases']} | "
+               f"Negative: {m['summary']['negative_cases']} | "
+               f"Confusion: {m['summary']['confusion_cases']} | "
+               f"Boundary: {m['summary']['boundary_cases']}")
+
+    out.append(f"\n--- Core Metrics ---")
+    out.append(f"  Precision:          {m['accuracy']['precision']}%")
+    out.append(f"  Recall:             {m['accuracy']['recall']}%")
+    out.append(f"  F1 Score:           {m['accuracy']['f1_score']}%")
+    out.append(f"  False Positive Rate:{m['accuracy']['false_positive_rate']}%")
+    out.append(f"  Confusion Rate:     {m['accuracy']['confusion_rate']}%")
+
+    out.append(f"\n--- Positive Cases (should trigger correct skill) ---")
     p = m["positive_results"]
-    print(f"  True Positive:  {p['true_positive']}")
-    print(f"  False Negative: {p['false_negative']} (missed)")
-    print(f"  Wrong Match:    {p['wrong_match']}")
+    out.append(f"  True Positive:  {p['true_positive']}")
+    out.append(f"  False Negative: {p['false_negative']} (missed)")
+    out.append(f"  Wrong Match:    {p['wrong_match']}")
 
-    print(f"\n--- Negative Cases (should NOT trigger) ---")
+    out.append(f"\n--- Negative Cases (should NOT trigger) ---")
     n = m["negative_results"]
-    print(f"  True Negative:  {n['true_negative']}")
-    print(f"  False Positive: {n['false_positive']} (wrongly triggered)")
+    out.append(f"  True Negative:  {n['true_negative']}")
+    out.append(f"  False Positive: {n['false_positive']} (wrongly triggered)")
 
-    print(f"\n--- Confusion Cases (ambiguous prompts) ---")
+    out.append(f"\n--- Confusion Cases (ambiguous prompts) ---")
     c = m["confusion_results"]
-    print(f"  Correct (primary): {c['correct_primary']}")
-    print(f"  Correct (alt):     {c['correct_alt']}")
-    print(f"  Wrong:             {c['wrong_match']}")
-    print(f"  No match:          {c['no_match']}")
-    print(f"  Acceptable Rate:   {c['acceptable_rate']}%")
+    out.append(f"  Correct (primary): {c['correct_primary']}")
+    out.append(f"  Correct (alt):     {c['correct_alt']}")
+    out.append(f"  Wrong:             {c['wrong_match']}")
+    out.append(f"  No match:          {c['no_match']}")
+    out.append(f"  Acceptable Rate:   {c['acceptable_rate']}%")
 
-    print(f"\n--- Boundary Cases (hard-to-trigger) ---")
+    out.append(f"\n--- Boundary Cases (hard-to-trigger) ---")
     b = m["boundary_results"]
-    print(f"  Correct:   {b['correct']}")
-    print(f"  Wrong:     {b['wrong_match']}")
-    print(f"  No match:  {b['no_match']}")
-    print(f"  Trigger Rate: {b['trigger_rate']}%")
+    out.append(f"  Correct:   {b['correct']}")
+    out.append(f"  Wrong:     {b['wrong_match']}")
+    out.append(f"  No match:  {b['no_match']}")
+    out.append(f"  Trigger Rate: {b['trigger_rate']}%")
 
-    print(f"\n--- Latency ---")
+    out.append(f"\n--- Latency ---")
     l = m["latency"]
-    print(f"  P50:  {l['p50_ms']}ms")
-    print(f"  P95:  {l['p95_ms']}ms")
-    print(f"  P99:  {l['p99_ms']}ms")
-    print(f"  Max:  {l['max_ms']}ms")
-    print(f"  Mean: {l['mean_ms']}ms")
+    out.append(f"  P50:  {l['p50_ms']}ms")
+    out.append(f"  P95:  {l['p95_ms']}ms")
+    out.append(f"  P99:  {l['p99_ms']}ms")
+    out.append(f"  Max:  {l['max_ms']}ms")
+    out.append(f"  Mean: {l['mean_ms']}ms")
 
     if m.get("per_category"):
-        print(f"\n--- Per Category ---")
+        out.append(f"\n--- Per Category ---")
         for cat, vals in m["per_category"].items():
-            print(f"  {cat:12s}: precision={vals['precision']}%, recall={vals['recall']}%")
-
-    print("\n" + "=" * 60)
-
-
-def main():
+            out.append(f"  {cat:12s}: precision={vals['precision']}%, recall={vals['recall']}%")
+
+    out.append("\n" + "=" * 60)
+
+    (stream or sys.stdout).write("\n".join(out) + "\n")
+
+
+def save_results(path: Path, output: dict):
+    """Write evaluation output as indented UTF-8 JSON (orjson when installed)."""
+    if orjson:
+        path.write_bytes(orjson.dumps(output, option=orjson.OPT_INDENT_2))
+    else:
+        path.write_bytes(json.dumps(output, indent=2, ensure_ascii=False).encode("utf-8"))
+
+
+def save_results_binary(path: Path, output: dict) -> Path:
+    """
+    Pickle evaluation output, zstd-compressed when zstandard is installed and
+    gzip-compressed otherwise. path is the base name without suffix; returns
+    the written path (.pkl.zst or .pkl.gz).
+    """
+    if zstandard:
+        path = path.with_name(path.name + ".pkl.zst")
+        with open(path, "wb") as f, zstandard.ZstdCompressor(level=3).stream_writer(f) as w:
+            pickle.dump(output, w, protocol=pickle.HIGHEST_PROTOCOL)
+    else:
+        path = path.with_name(path.name + ".pkl.gz")
+        with gzip.open(path, "wb", compresslevel=3) as f:
+            pickle.dump(output, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+def load_results(path: Path) -> dict:
+    """Load output written by save_results or save_results_binary."""
+    path = Path(path)
+    if path.name.endswith(".pkl.zst"):
+        if zstandard is None:
+            raise RuntimeError(f"zstandard is required to read {path}")
+        with open(path, "rb") as f, zstandard.ZstdDecompressor().stream_reader(f) as r:
+            return pickle.load(r)
+    if path.name.endswith(".pkl.gz"):
+        with gzip.open(path, "rb") as f:
+            return pickle.load(f)
+    data = path.read_bytes()
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Run skill-router evaluation")
     parser.add_argument("--index", type=str, default=str(DEFAULT_INDEX), help="Path to index.json")
     parser.add_argument("--verbose", "-v", action="store_true", help="Print each test case result")
     parser.add_argument("--save", "-s", action="store_true", help="Save results to file")
-    args = parser.parse_args()
-
+    parser.add_argument("--save-binary", action="store_true",
+                        help="Save results as compressed pickle (.pkl.zst, or .pkl.gz without zstandard)")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Worker processes for matching (latencies are noisier above 1)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Time prompt preprocessing too instead of using the memo cache, "
+                             "and parse index.json directly instead of via its binary cache")
+    subparsers = parser.add_subparsers(dest="command")
+    sweep = subparsers.add_parser("sweep", help="Evaluate several trigger thresholds in one process")
+    sweep.add_argument("thresholds", type=float, nargs="+", help="Trigger thresholds to evaluate")
+    return parser
+
+
+def _save(output: dict, suffix: str = "", binary: bool = False) -> Path:
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
+    result_path = RESULTS_DIR / f"eval_{timestamp}{suffix}"
+    if binary:
+        return save_results_binary(result_path, output)
+    result_path = result_path.with_name(result_path.name + ".json")
+    save_results(result_path, output)
+    return result_path
+
+
+def _load_inputs(args) -> tuple:
     print("Loading test cases...")
     test_cases = load_test_cases()
     print(f"  {len(test_cases)} test cases loaded")
 
     print("Loading index...")
-    index = load_index(Path(args.index))
+    if args.no_cache:
+        index = load_index(Path(args.index), use_cache=False)
+    else:
+        index = load_index_memoized(Path(args.index))
     skills = index.get("skills", [])
     print(f"  {len(skills)} skills in index")
+    return test_cases, skills
+
+
+def run(args) -> dict:
+    """Run one evaluation at TRIGGER_THRESHOLD; callable in-process with parsed args."""
+    test_cases, skills = _load_inputs(args)
 
     print(f"\nRunning evaluation (threshold={TRIGGER_THRESHOLD})...")
-    output = evaluate(test_cases, skills, verbose=args.verbose)
+    output = evaluate(
+        test_cases, skills, verbose=args.verbose, jobs=args.jobs, use_cache=not args.no_cache,
+    )
 
     print_report(output["metrics"])
 
     if args.save:
-        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
-        timestamp = time.strftime("%Y%m%d_%H%M%S")
-        result_path = RESULTS_DIR / f"eval_{timestamp}.json"
-        result_path.write_text(
-            json.dumps(output, indent=2, ensure_ascii=False),
-            encoding="utf-8",
-        )
+        result_path = _save(output)
+        print(f"\nResults saved to {result_path}")
+    if args.save_binary:
+        result_path = _save(output, binary=True)
         print(f"\nResults saved to {result_path}")
 
     # Print failures for debugging
@@ -355,6 +560,56 @@ def main():
             print(f"  #{f['id']} ({f['type']}): \"{f['prompt']}\"")
             print(f"    expected={f['expected']}, got={f['matched']} (score={f['score']})")
 
+    return output
+
+
+def run_sweep(args) -> dict:
+    """
+    Evaluate each of args.thresholds against the same loaded index, reusing
+    one worker pool when jobs > 1. Returns {threshold: output}.
+    """
+    test_cases, skills = _load_inputs(args)
+    outputs = {}
+
+    with ExitStack() as stack:
+        pool = None
+        if args.jobs > 1:
+            pool = stack.enter_context(
+                make_pool(args.jobs, skills, not args.no_cache, args.verbose)
+            )
+        for threshold in args.thresholds:
+            print(f"\nRunning evaluation (threshold={threshold:g})...")
+            outputs[threshold] = evaluate(
+                test_cases, skills, verbose=args.verbose, jobs=args.jobs,
+                use_cache=not args.no_cache, threshold=threshold, pool=pool,
+            )
+            if args.save:
+                result_path = _save(outputs[threshold], f"_t{threshold:g}")
+                print(f"  Results saved to {result_path}")
+            if args.save_binary:
+                result_path = _save(outputs[threshold], f"_t{threshold:g}", binary=True)
+                print(f"  Results saved to {result_path}")
+
+    print("\n" + "=" * 60)
+    print("  THRESHOLD SWEEP")
+    print("=" * 60)
+    print(f"  {'Threshold':>9s}  {'Precision':>9s}  {'Recall':>6s}  {'F1':>5s}  {'FPR':>5s}")
+    for threshold, output in outputs.items():
+        a = output["metrics"]["accuracy"]
+        print(f"  {threshold:9g}  {a['precision']:8.1f}%  {a['recall']:5.1f}%  "
+              f"{a['f1_score']:4.1f}%  {a['false_positive_rate']:4.1f}%")
+    print("=" * 60)
+
+    return outputs
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "sweep":
+        run_sweep(args)
+    else:
+        run(args)
+
 
 if __name__ == "__main__":
     main()
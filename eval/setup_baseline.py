@@ -15,12 +15,24 @@ Usage:
     python setup_baseline.py [--dry-run] [--install] [--output-dir PATH]
 """
 
-import json
+import os
+import re
 import sys
 import argparse
 import shutil
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from itertools import accumulate
+from operator import itemgetter
 from pathlib import Path
 
+from _index_cache import load_index_cached
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 try:
     import yaml
 except ImportError:
@@ -36,6 +48,11 @@ CONTEXT_WINDOW = 128000
 BUDGET_RATIO = 0.02
 BUDGET_CHARS = int(CONTEXT_WINDOW * BUDGET_RATIO)
 
+_NATIVE_SKILL_TEMPLATE = '---\nname: "{display_name}"\ndescription: "{description}"\n---\n\n{content}'
+
+# Fallback metadata parser: the two keys we need, one per line, any indentation
+_META_RE = re.compile(r"^[^\S\n]*(display_name|short_description):(.*)$", re.M)
+
 
 def load_metadata_yaml(skill_dir: Path) -> dict:
     """Load metadata.yaml from a skill directory."""
@@ -46,14 +63,7 @@ def load_metadata_yaml(skill_dir: Path) -> dict:
     if yaml:
         return yaml.safe_load(text) or {}
     # Fallback: simple key-value parsing for the fields we need
-    result = {}
-    for line in text.split("\n"):
-        line = line.strip()
-        if line.startswith("display_name:"):
-            result["display_name"] = line.split(":", 1)[1].strip().strip('"')
-        elif line.startswith("short_description:"):
-            result["short_description"] = line.split(":", 1)[1].strip().strip('"')
-    return result
+    return {m.group(1): m.group(2).strip().strip('"') for m in _META_RE.finditer(text)}
 
 
 def load_skill_content(skill_dir: Path) -> str:
@@ -66,15 +76,17 @@ def load_skill_content(skill_dir: Path) -> str:
 
 def generate_native_skill(name: str, display_name: str, description: str, content: str) -> str:
     """Generate Claude Code native skill format: YAML frontmatter + content."""
-    lines = [
-        "---",
-        f"name: \"{display_name}\"",
-        f"description: \"{description}\"",
-        "---",
-        "",
-        content,
-    ]
-    return "\n".join(lines)
+    return _NATIVE_SKILL_TEMPLATE.format(
+        display_name=display_name, description=description, content=content,
+    )
+
+
+def _sorted_subdirs(path) -> list:
+    """Non-hidden subdirectories of path as DirEntry objects, sorted by name."""
+    with os.scandir(path) as it:
+        entries = [e for e in it if not e.name.startswith(".") and e.is_dir()]
+    entries.sort(key=lambda e: e.name)
+    return entries
 
 
 def discover_skills(cloud_skills_dir: Path) -> list:
@@ -83,37 +95,48 @@ def discover_skills(cloud_skills_dir: Path) -> list:
     if not categories_dir.exists():
         return []
     skills = []
-    for cat_dir in sorted(categories_dir.iterdir()):
-        if not cat_dir.is_dir() or cat_dir.name.startswith("."):
-            continue
-        for skill_dir in sorted(cat_dir.iterdir()):
-            if not skill_dir.is_dir() or skill_dir.name.startswith("."):
-                continue
-            if (skill_dir / "SKILL.md").exists():
+    # scandir's DirEntry caches the type from the directory read, so the
+    # is_dir() checks need no extra stat calls
+    for cat_entry in _sorted_subdirs(categories_dir):
+        for skill_entry in _sorted_subdirs(cat_entry.path):
+            if os.path.exists(os.path.join(skill_entry.path, "SKILL.md")):
                 skills.append({
-                    "dir": skill_dir,
-                    "name": skill_dir.name,
-                    "category": cat_dir.name,
+                    "dir": Path(skill_entry.path),
+                    "name": skill_entry.name,
+                    "category": cat_entry.name,
                 })
     return skills
 
 
+def _ingest(sd: dict) -> tuple:
+    """Read metadata.yaml and SKILL.md for one discovered skill."""
+    return sd, load_metadata_yaml(sd["dir"]), load_skill_content(sd["dir"])
+
+
 def analyze_budget(descriptions: list) -> dict:
-    """Analyze which skills fit within the 2% description budget."""
-    # Sort by description length ascending (shorter first = Claude Code packing order)
-    sorted_descs = sorted(descriptions, key=lambda d: len(d["description_line"]))
-
-    total_chars = sum(len(d["description_line"]) for d in sorted_descs)
-    cumulative = 0
-    visible = []
-    hidden = []
-
-    for d in sorted_descs:
-        cumulative += len(d["description_line"])
-        if cumulative <= BUDGET_CHARS:
-            visible.append(d)
-        else:
-            hidden.append(d)
+    """
+    Analyze which skills fit within the 2% description budget.
+    descriptions: dicts with name, category and desc_len (budget line length).
+    """
+    # Sort by description length ascending (shorter first = Claude Code packing order).
+    # Lengths are non-negative, so the running total is monotonic and everything
+    # past the first entry that overflows the budget is hidden.
+    if np is not None:
+        lens_raw = np.fromiter((d["desc_len"] for d in descriptions),
+                               dtype=np.int64, count=len(descriptions))
+        order = np.argsort(lens_raw, kind="stable")
+        sorted_descs = [descriptions[i] for i in order]
+        cum = np.cumsum(lens_raw[order])
+        total_chars = int(cum[-1]) if len(cum) else 0
+        cutoff = int(np.searchsorted(cum, BUDGET_CHARS, side="right"))
+    else:
+        sorted_descs = sorted(descriptions, key=itemgetter("desc_len"))
+        cum = list(accumulate(d["desc_len"] for d in sorted_descs))
+        total_chars = cum[-1] if cum else 0
+        cutoff = bisect_right(cum, BUDGET_CHARS)
+
+    visible = sorted_descs[:cutoff]
+    hidden = sorted_descs[cutoff:]
 
     return {
         "total_chars": total_chars,
@@ -130,6 +153,7 @@ def main():
     parser.add_argument("--install", action="store_true", help="Install to ~/.claude/skills/")
     parser.add_argument("--output-dir", type=str, default=str(DEFAULT_OUTPUT_DIR), help="Output directory")
     parser.add_argument("--index", type=str, default=str(DEFAULT_INDEX), help="Path to index.json (for metadata fallback)")
+    parser.add_argument("--no-cache", action="store_true", help="Parse index.json directly instead of via its binary cache")
     args = parser.parse_args()
 
     output_dir = Path(args.output_dir)
@@ -139,7 +163,7 @@ def main():
     # Load index as fallback for metadata
     index_skills = {}
     if Path(args.index).exists():
-        index_data = json.loads(Path(args.index).read_text(encoding="utf-8"))
+        index_data = load_index_cached(Path(args.index), use_cache=not args.no_cache)
         for s in index_data.get("skills", []):
             index_skills[s["name"]] = s
 
@@ -155,28 +179,32 @@ def main():
     # Process each skill
     generated = []
     descriptions = []
-    for sd in skill_dirs:
+    # Reads are I/O-bound, so fan them out over threads; map keeps discovery order
+    with ThreadPoolExecutor(max_workers=min(32, len(skill_dirs))) as ex:
+        ingested = list(ex.map(_ingest, skill_dirs))
+
+    for sd, meta, content in ingested:
         name = sd["name"]
         category = sd["category"]
-        skill_dir = sd["dir"]
 
-        # Load metadata (prefer yaml, fallback to index.json)
-        meta = load_metadata_yaml(skill_dir)
+        # Metadata: prefer yaml, fallback to index.json
         idx_meta = index_skills.get(name, {})
 
         display_name = meta.get("display_name") or idx_meta.get("display_name", name)
         description = meta.get("short_description") or idx_meta.get("short_description", "")
-        content = load_skill_content(skill_dir)
 
         native_content = generate_native_skill(name, display_name, description, content)
-        description_line = f"{display_name}: {description}"
+        # Length of the "{display_name}: {description}" budget line; only the
+        # length is needed, so the line itself is never built (str() renders
+        # a null or non-string field as the f-string did)
+        desc_len = len(str(display_name)) + 2 + len(str(description))
 
         generated.append({
             "name": name,
             "category": category,
             "display_name": display_name,
             "description": description,
-            "description_line": description_line,
+            "desc_len": desc_len,
             "native_content": native_content,
             "content_chars": len(native_content),
         })
@@ -184,7 +212,7 @@ def main():
         descriptions.append({
             "name": name,
             "category": category,
-            "description_line": description_line,
+            "desc_len": desc_len,
         })
 
     # Budget analysis
@@ -201,13 +229,21 @@ def main():
     print(f"  Skills within budget:    {len(budget['visible'])}/{len(generated)} ({len(budget['visible'])*100//len(generated)}%)")
     print(f"  Skills EXCLUDED:         {len(budget['hidden'])}/{len(generated)} ({len(budget['hidden'])*100//len(generated)}%)")
 
+    # One name-ordered pass over all skills, split by budget membership, instead of
+    # re-sorting the visible and hidden lists separately (discovery order is by
+    # category first, so it is not name order)
+    visible_ids = {id(d) for d in budget['visible']}
+    by_name = sorted(descriptions, key=itemgetter("name"))
+    visible_rows = [d for d in by_name if id(d) in visible_ids]
+    hidden_rows = [d for d in by_name if id(d) not in visible_ids]
+
     print(f"\n  Visible skills ({len(budget['visible'])}):")
-    for d in sorted(budget['visible'], key=lambda x: x['name']):
-        print(f"    + {d['name']:30s} ({len(d['description_line']):3d} chars)")
+    for d in visible_rows:
+        print(f"    + {d['name']:30s} ({d['desc_len']:3d} chars)")
 
     print(f"\n  Hidden skills ({len(budget['hidden'])}):")
-    for d in sorted(budget['hidden'], key=lambda x: x['name']):
-        print(f"    - {d['name']:30s} ({len(d['description_line']):3d} chars)")
+    for d in hidden_rows:
+        print(f"    - {d['name']:30s} ({d['desc_len']:3d} chars)")
 
     # Write files
     if args.dry_run:
@@ -223,9 +259,12 @@ def main():
         print(f"\n  Writing {len(generated)} files to: {output_dir}")
         output_dir.mkdir(parents=True, exist_ok=True)
 
-        for g in generated:
-            file_path = output_dir / f"{g['name']}.md"
-            file_path.write_text(g['native_content'], encoding="utf-8")
+        def write_skill(g):
+            (output_dir / f"{g['name']}.md").write_text(g['native_content'], encoding="utf-8")
+
+        # Writes are I/O-bound; list() drains the map so any write error is raised here
+        with ThreadPoolExecutor(max_workers=min(16, len(generated))) as ex:
+            list(ex.map(write_skill, generated))
 
         print(f"  Done! {len(generated)} skill files written.")
 
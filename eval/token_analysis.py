@@ -11,32 +11,65 @@ Usage:
     python token_analysis.py [--index PATH] [--context-window 128000]
 """
 
+import functools
 import json
+import re
 import sys
 import argparse
+from bisect import bisect_right
+from itertools import accumulate
 from pathlib import Path
-from collections import defaultdict
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 # Add scripts dir to path
 SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
 sys.path.insert(0, str(SCRIPTS_DIR))
 
 from config import MAX_SKILL_CONTENT_CHARS
-from matcher import match_skills, select_best
 
 EVAL_DIR = Path(__file__).resolve().parent
 DEFAULT_INDEX = Path(__file__).resolve().parent.parent.parent / "cloud-skills" / "index.json"
 TEST_CASES_PATH = EVAL_DIR / "test_cases.json"
 
 
+def _tokens_for_ascii_len(n: int) -> int:
+    """estimate_tokens() of an n-char ASCII string, without building one."""
+    return int(n / 4)
+
+
+_ZH_RE = re.compile("[\u4e00-\u9fff]+")
+
+
+@functools.lru_cache(maxsize=4096)
 def estimate_tokens(text: str) -> int:
     """Estimate token count. ~4 chars per token for English, ~2 for Chinese."""
-    en_chars = sum(1 for c in text if c.isascii())
-    zh_chars = sum(1 for c in text if '\u4e00' <= c <= '\u9fff')
+    if text.isascii():
+        # O(1) for pure-ASCII strings, which most English descriptions are
+        return _tokens_for_ascii_len(len(text))
+    if np is not None:
+        codes = np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+        en_chars = int((codes < 128).sum())
+        zh_chars = int(((codes >= 0x4E00) & (codes <= 0x9FFF)).sum())
+    else:
+        # Both counts in C: encoding drops non-ASCII, and the regex sub drops CJK
+        en_chars = len(text.encode("ascii", "ignore"))
+        zh_chars = len(text) - len(_ZH_RE.sub("", text))
     other_chars = len(text) - en_chars - zh_chars
     return int(en_chars / 4 + zh_chars / 1.5 + other_chars / 3)
 
 
+def _intern(value):
+    """Intern string values so repeated category keys hash and compare by identity."""
+    return sys.intern(value) if type(value) is str else value
+
+
 def build_description_entry(skill: dict) -> str:
     """Build the description string as Claude Code would see it for a skill."""
     name = skill.get("display_name", skill["name"])
@@ -45,82 +78,118 @@ def build_description_entry(skill: dict) -> str:
 
 
 def analyze_budget(skills: list, context_window: int) -> dict:
-    """Analyze which skills fit within Claude Code's 2% description budget."""
+    """
+    Analyze which skills fit within Claude Code's 2% description budget.
+    Uses each skill's description_chars / description_tokens when the index
+    provides them (len and estimate_tokens of build_description_entry).
+    """
     budget_chars = int(context_window * 0.02)
 
-    # Build description entries and sort by length (shorter first = more can fit)
-    entries = []
+    # Column layout: parallel name/category/char-count lists, ordered through an
+    # index permutation. Tokens are only reported as a total, summed per entry
+    # since each estimate is truncated to an int on its own
+    names = []
+    categories = []
+    chars = []
+    total_tokens = 0
     for skill in skills:
-        entry_text = build_description_entry(skill)
-        entries.append({
-            "name": skill["name"],
-            "category": skill.get("category", "unknown"),
-            "text": entry_text,
-            "chars": len(entry_text),
-            "tokens": estimate_tokens(entry_text),
-        })
-
-    # Sort by char length ascending (Claude Code fills budget with shorter descriptions first)
-    entries.sort(key=lambda e: e["chars"])
-
-    total_chars = sum(e["chars"] for e in entries)
-    total_tokens = sum(e["tokens"] for e in entries)
-
-    # Determine which fit within budget
-    cumulative = 0
-    visible = []
-    hidden = []
-    for e in entries:
-        cumulative += e["chars"]
-        if cumulative <= budget_chars:
-            visible.append(e)
-        else:
-            hidden.append(e)
-
-    # Category breakdown of hidden skills
-    hidden_by_category = defaultdict(int)
-    for e in hidden:
-        hidden_by_category[e["category"]] += 1
-
-    visible_by_category = defaultdict(int)
-    for e in visible:
-        visible_by_category[e["category"]] += 1
+        names.append(_intern(skill["name"]))
+        categories.append(_intern(skill.get("category", "unknown")))
+        # Index builds may precompute both counts; otherwise derive them here
+        entry_chars = skill.get("description_chars")
+        entry_tokens = skill.get("description_tokens")
+        if entry_chars is None or entry_tokens is None:
+            entry_text = build_description_entry(skill)
+            entry_chars = len(entry_text)
+            entry_tokens = estimate_tokens(entry_text)
+        chars.append(entry_chars)
+        total_tokens += entry_tokens
+
+    # Order by char length ascending (Claude Code fills budget with shorter
+    # descriptions first; ties keep index order). The running total only grows,
+    # so the visible skills are the prefix whose cumulative chars stay in budget
+    if np is not None:
+        chars_arr = np.asarray(chars, dtype=np.int64)
+        order = np.argsort(chars_arr, kind="stable")
+        cumulative = np.cumsum(chars_arr[order])
+        total_chars = int(cumulative[-1]) if len(cumulative) else 0
+        cutoff = int(np.searchsorted(cumulative, budget_chars, side="right"))
+        order = order.tolist()
+    else:
+        order = sorted(range(len(chars)), key=chars.__getitem__)
+        cumulative = list(accumulate(chars[i] for i in order))
+        total_chars = cumulative[-1] if cumulative else 0
+        cutoff = bisect_right(cumulative, budget_chars)
+    visible_idx = order[:cutoff]
+    hidden_idx = order[cutoff:]
+
+    # Category breakdown of hidden and visible skills, in one counting pass
+    # keyed by (category, is_visible)
+    cat_split = Counter((categories[i], pos < cutoff) for pos, i in enumerate(order))
+    visible_by_category = {cat: n for (cat, visible), n in cat_split.items() if visible}
+    hidden_by_category = {cat: n for (cat, visible), n in cat_split.items() if not visible}
 
     return {
         "budget_chars": budget_chars,
         "total_chars": total_chars,
         "total_tokens": total_tokens,
-        "total_skills": len(entries),
-        "visible_count": len(visible),
-        "hidden_count": len(hidden),
-        "visible_skills": [e["name"] for e in visible],
-        "hidden_skills": [e["name"] for e in hidden],
+        "total_skills": len(names),
+        "visible_count": len(visible_idx),
+        "hidden_count": len(hidden_idx),
+        "visible_skills": [names[i] for i in visible_idx],
+        "hidden_skills": [names[i] for i in hidden_idx],
         "visible_by_category": dict(visible_by_category),
         "hidden_by_category": dict(hidden_by_category),
         "overflow_ratio": total_chars / budget_chars if budget_chars > 0 else 0,
     }
 
 
-def analyze_plan_a(skills: list, test_cases: list) -> dict:
-    """Analyze 方案A (skill-router) token costs."""
-    injection_tokens = []
-    triggered_count = 0
+def _injection_tokens(prompt: str, skills: list) -> Optional[int]:
+    """Estimated injection tokens for one prompt, or None if no skill triggers."""
+    # Imported here so budget-only use of this module does not load the matcher
+    from matcher import match_skills, select_best
+
+    result = select_best(match_skills(prompt, skills))
+    if result is None:
+        return None
+    skill, score, _ = result
+    # Injection = skill content (SKILL.md) capped at MAX_SKILL_CONTENT_CHARS
+    content_size = skill.get("content_size_bytes", 500)
+    # Approximate: content_size_bytes ≈ char count for UTF-8 English text
+    injection_chars = min(content_size, MAX_SKILL_CONTENT_CHARS)
+    return _tokens_for_ascii_len(injection_chars)
+
 
-    for tc in test_cases:
-        prompt = tc["prompt"]
-        ranked = match_skills(prompt, skills)
-        result = select_best(ranked)
+# Per-process state for parallel runs, set once by _init_worker so the skill
+# list is pickled once per worker rather than once per test case.
+_WORKER_STATE = {}
 
-        if result is not None:
-            triggered_count += 1
-            skill, score, _ = result
-            # Injection = skill content (SKILL.md) capped at MAX_SKILL_CONTENT_CHARS
-            content_size = skill.get("content_size_bytes", 500)
-            # Approximate: content_size_bytes ≈ char count for UTF-8 English text
-            injection_chars = min(content_size, MAX_SKILL_CONTENT_CHARS)
-            injection_tokens.append(estimate_tokens("x" * injection_chars))
-        else:
-            injection_tokens.append(0)
+
+def _init_worker(skills: list):
+    _WORKER_STATE.update(skills=skills)
+
+
+def _injection_tokens_in_worker(prompt: str) -> Optional[int]:
+    return _injection_tokens(prompt, **_WORKER_STATE)
+
+
+def analyze_plan_a(skills: list, test_cases: list, workers: int = 1) -> dict:
+    """
+    Analyze 方案A (skill-router) token costs.
+    With workers > 1, prompts are matched in a process pool.
+    """
+    prompts = [tc["prompt"] for tc in test_cases]
+    if workers > 1:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(skills,),
+        ) as pool:
+            chunksize = max(1, len(prompts) // (4 * workers))
+            per_case = list(pool.map(_injection_tokens_in_worker, prompts, chunksize=chunksize))
+    else:
+        per_case = [_injection_tokens(prompt, skills) for prompt in prompts]
+
+    triggered_count = sum(1 for t in per_case if t is not None)
+    injection_tokens = [0 if t is None else t for t in per_case]
 
     avg_injection = sum(injection_tokens) / len(injection_tokens) if injection_tokens else 0
     trigger_rate = triggered_count / len(test_cases) if test_cases else 0
@@ -136,64 +205,74 @@ def analyze_plan_a(skills: list, test_cases: list) -> dict:
 
 
 def print_report(budget_analysis: dict, plan_a: dict, context_window: int, session_turns: int):
-    """Print formatted comparison report."""
-    print()
-    print("=" * 64)
-    print("  TOKEN COST COMPARISON: skill-router vs Full Local Install")
-    print("=" * 64)
-
-    print(f"\n  Context Window: {context_window:,} tokens")
-    print(f"  Description Budget (2%): {budget_analysis['budget_chars']:,} chars")
-    print(f"  Session Length: {session_turns} turns")
+    """Print formatted comparison report in one write to stdout."""
+    # Values used several times below, read once
+    total_skills = budget_analysis['total_skills']
+    total_tokens = budget_analysis['total_tokens']
+    visible_count = budget_analysis['visible_count']
+    hidden_count = budget_analysis['hidden_count']
+    budget_chars = budget_analysis['budget_chars']
+    out = []  # report lines, written to stdout in one call at the end
+
+    out.append("")
+    out.append("=" * 64)
+    out.append("  TOKEN COST COMPARISON: skill-router vs Full Local Install")
+    out.append("=" * 64)
+
+    out.append(f"\n  Context Window: {context_window:,} tokens")
+    out.append(f"  Description Budget (2%): {budget_chars:,} chars")
+    out.append(f"  Session Length: {session_turns} turns")
 
     # 方案B
-    print(f"\n{'─' * 64}")
-    print(f"  方案B (全部本地安装 / Full Local Install)")
-    print(f"{'─' * 64}")
-    print(f"  Total skills:                    {budget_analysis['total_skills']}")
-    print(f"  Total description chars:         {budget_analysis['total_chars']:,}")
-    print(f"  Total description tokens:        {budget_analysis['total_tokens']:,}")
-    print(f"  Budget capacity:                 {budget_analysis['budget_chars']:,} chars")
-    print(f"  Overflow ratio:                  {budget_analysis['overflow_ratio']:.1f}x")
-    print(f"  Skills VISIBLE within budget:    {budget_analysis['visible_count']}/{budget_analysis['total_skills']} ({budget_analysis['visible_count']*100//budget_analysis['total_skills']}%)")
-    print(f"  Skills HIDDEN (over budget):     {budget_analysis['hidden_count']}/{budget_analysis['total_skills']} ({budget_analysis['hidden_count']*100//budget_analysis['total_skills']}%)")
-    print(f"  Per-turn cost (always present):  {budget_analysis['total_tokens']:,} tokens")
-    b_session_cost = budget_analysis['total_tokens'] * session_turns
-    print(f"  Per-session cost ({session_turns} turns):      {b_session_cost:,} tokens")
-
-    print(f"\n  Hidden skills by category:")
+    out.append(f"\n{'─' * 64}")
+    out.append(f"  方案B (全部本地安装 / Full Local Install)")
+    out.append(f"{'─' * 64}")
+    out.append(f"  Total skills:                    {total_skills}")
+    out.append(f"  Total description chars:         {budget_analysis['total_chars']:,}")
+    out.append(f"  Total description tokens:        {total_tokens:,}")
+    out.append(f"  Budget capacity:                 {budget_chars:,} chars")
+    out.append(f"  Overflow ratio:                  {budget_analysis['overflow_ratio']:.1f}x")
+    out.append(f"  Skills VISIBLE within budget:    {visible_count}/{total_skills} ({visible_count*100//total_skills}%)")
+    out.append(f"  Skills HIDDEN (over budget):     {hidden_count}/{total_skills} ({hidden_count*100//total_skills}%)")
+    out.append(f"  Per-turn cost (always present):  {total_tokens:,} tokens")
+    b_session_cost = total_tokens * session_turns
+    out.append(f"  Per-session cost ({session_turns} turns):      {b_session_cost:,} tokens")
+
+    out.append(f"\n  Hidden skills by category:")
     for cat, count in sorted(budget_analysis['hidden_by_category'].items()):
         total_in_cat = budget_analysis['visible_by_category'].get(cat, 0) + count
-        print(f"    {cat:15s}: {count}/{total_in_cat} hidden")
+        out.append(f"    {cat:15s}: {count}/{total_in_cat} hidden")
 
     # 方案A
-    print(f"\n{'─' * 64}")
-    print(f"  方案A (skill-router / On-Demand Injection)")
-    print(f"{'─' * 64}")
-    print(f"  Idle cost:                       {plan_a['idle_cost_tokens']} tokens")
-    print(f"  Skills routable:                 {budget_analysis['total_skills']}/100 (100%)")
-    print(f"  Trigger rate on test set:        {plan_a['trigger_rate']}%")
-    print(f"  Avg injection cost (triggered):  {plan_a['avg_injection_tokens']:,} tokens")
-    print(f"  Max injection cost:              {plan_a['max_injection_tokens']:,} tokens")
+    out.append(f"\n{'─' * 64}")
+    out.append(f"  方案A (skill-router / On-Demand Injection)")
+    out.append(f"{'─' * 64}")
+    out.append(f"  Idle cost:                       {plan_a['idle_cost_tokens']} tokens")
+    out.append(f"  Skills routable:                 {total_skills}/100 (100%)")
+    out.append(f"  Trigger rate on test set:        {plan_a['trigger_rate']}%")
+    out.append(f"  Avg injection cost (triggered):  {plan_a['avg_injection_tokens']:,} tokens")
+    out.append(f"  Max injection cost:              {plan_a['max_injection_tokens']:,} tokens")
     avg_per_turn = round(plan_a['avg_injection_tokens'] * plan_a['trigger_rate'] / 100)
-    print(f"  Avg per-turn cost:               {avg_per_turn:,} tokens")
+    out.append(f"  Avg per-turn cost:               {avg_per_turn:,} tokens")
     a_session_cost = avg_per_turn * session_turns
-    print(f"  Per-session cost ({session_turns} turns):      {a_session_cost:,} tokens")
+    out.append(f"  Per-session cost ({session_turns} turns):      {a_session_cost:,} tokens")
 
     # Comparison
-    print(f"\n{'─' * 64}")
-    print(f"  COMPARISON SUMMARY")
-    print(f"{'─' * 64}")
+    out.append(f"\n{'─' * 64}")
+    out.append(f"  COMPARISON SUMMARY")
+    out.append(f"{'─' * 64}")
     savings = (1 - a_session_cost / b_session_cost) * 100 if b_session_cost > 0 else 0
-    print(f"  {'':30s} {'方案A':>10s}  {'方案B':>10s}  {'差异':>10s}")
-    print(f"  {'Routable skills':30s} {'100':>10s}  {budget_analysis['visible_count']:>10d}  {'+' + str(budget_analysis['hidden_count']):>10s}")
-    print(f"  {'Idle cost (tokens)':30s} {'0':>10s}  {budget_analysis['total_tokens']:>10,}  {'-' + str(budget_analysis['total_tokens']):>10s}")
-    print(f"  {'Avg per-turn cost':30s} {avg_per_turn:>10,}  {budget_analysis['total_tokens']:>10,}  {'-' + str(budget_analysis['total_tokens'] - avg_per_turn):>10s}")
-    print(f"  {'Session cost (' + str(session_turns) + ' turns)':30s} {a_session_cost:>10,}  {b_session_cost:>10,}  {'-' + str(b_session_cost - a_session_cost):>10s}")
-    print(f"  {'Token savings':30s} {'':>10s}  {'':>10s}  {savings:>9.1f}%")
+    out.append(f"  {'':30s} {'方案A':>10s}  {'方案B':>10s}  {'差异':>10s}")
+    out.append(f"  {'Routable skills':30s} {'100':>10s}  {visible_count:>10d}  {'+' + str(hidden_count):>10s}")
+    out.append(f"  {'Idle cost (tokens)':30s} {'0':>10s}  {total_tokens:>10,}  {'-' + str(total_tokens):>10s}")
+    out.append(f"  {'Avg per-turn cost':30s} {avg_per_turn:>10,}  {total_tokens:>10,}  {'-' + str(total_tokens - avg_per_turn):>10s}")
+    out.append(f"  {'Session cost (' + str(session_turns) + ' turns)':30s} {a_session_cost:>10,}  {b_session_cost:>10,}  {'-' + str(b_session_cost - a_session_cost):>10s}")
+    out.append(f"  {'Token savings':30s} {'':>10s}  {'':>10s}  {savings:>9.1f}%")
+
+    out.append(f"\n  方案A saves {savings:.1f}% tokens vs 方案B")
+    out.append("=" * 64)
 
-    print(f"\n  方案A saves {savings:.1f}% tokens vs 方案B")
-    print("=" * 64)
+    sys.stdout.write("\n".join(out) + "\n")
 
 
 def main():
@@ -201,6 +280,7 @@ def main():
     parser.add_argument("--index", type=str, default=str(DEFAULT_INDEX), help="Path to index.json")
     parser.add_argument("--context-window", type=int, default=128000, help="Context window size in tokens")
     parser.add_argument("--session-turns", type=int, default=30, help="Assumed turns per session")
+    parser.add_argument("--workers", "-j", type=int, default=1, help="Worker processes for 方案A matching")
     args = parser.parse_args()
 
     print("Loading index...")
@@ -216,7 +296,7 @@ def main():
     budget_analysis = analyze_budget(skills, args.context_window)
 
     print("Analyzing 方案A injection costs...")
-    plan_a = analyze_plan_a(skills, test_cases)
+    plan_a = analyze_plan_a(skills, test_cases, workers=args.workers)
 
     print_report(budget_analysis, plan_a, args.context_window, args.session_turns)
 
@@ -4,17 +4,28 @@ Handles TTL-based expiration, hash-based content validation, and offline fallbac
 """
 
 import json
+import marshal
 import os
 import time
+from pathlib import Path
 from typing import Optional
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 from config import (
     CACHE_DIR,
     SKILLS_CACHE_DIR,
     INDEX_CACHE_PATH,
     CACHE_META_PATH,
     INDEX_TTL,
-    SKILL_TTL,
 )
 
 
@@ -24,47 +35,128 @@ def ensure_cache_dirs():
     SKILLS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
 
+def _read_json(path: Path):
+    """Parse a UTF-8 JSON file, using orjson when it is installed."""
+    raw = path.read_bytes()
+    if orjson:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _write_json(path: Path, data):
+    """Write data as indented UTF-8 JSON, using orjson when it is installed."""
+    if orjson:
+        path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        path.write_bytes(json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8"))
+
+
 def _load_meta() -> dict:
     """Load cache metadata file."""
     if CACHE_META_PATH.exists():
         try:
-            return json.loads(CACHE_META_PATH.read_text(encoding="utf-8"))
+            return _read_json(CACHE_META_PATH)
         except (json.JSONDecodeError, OSError):
             pass
     return {"index": {}, "skills": {}}
 
 
 def _save_meta(meta: dict):
-    """Save cache metadata file."""
+    """Save cache metadata file atomically (temp file + os.replace)."""
+    tmp_path = CACHE_META_PATH.with_name(f"{CACHE_META_PATH.name}.{os.getpid()}.tmp")
     try:
-        CACHE_META_PATH.write_text(
-            json.dumps(meta, indent=2, ensure_ascii=False),
-            encoding="utf-8",
-        )
+        _write_json(tmp_path, meta)
+        os.replace(tmp_path, CACHE_META_PATH)
     except OSError:
-        pass
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
 
 
 # ---------- Index Cache ----------
 
-def get_cached_index() -> Optional[dict]:
+# Parsed index.json for this process, keyed by the file's (st_mtime_ns, st_size)
+# so repeated loads skip the JSON parse until the file changes
+_INDEX_MEMO: dict = {}
+
+
+def _index_key(st: Optional[os.stat_result] = None) -> tuple:
+    st = st or os.stat(INDEX_CACHE_PATH)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _packed_index_path() -> Path:
     """
-    Load cached index.json if it exists and is not expired.
-    Returns the parsed JSON or None.
+    Binary copy of index.json written alongside it, so each hook process
+    (one per prompt) can skip the JSON parse: msgpack when installed,
+    otherwise marshal, which loads plain dicts/lists without running code.
     """
-    if not INDEX_CACHE_PATH.exists():
-        return None
+    suffix = ".msgpack" if msgpack else ".marshal"
+    return INDEX_CACHE_PATH.with_suffix(suffix)
 
-    meta = _load_meta()
-    cached_at = meta.get("index", {}).get("cached_at", 0)
 
-    if time.time() - cached_at > INDEX_TTL:
-        return None  # expired
+def _save_packed_index(data: dict):
+    packed_path = _packed_index_path()
+    tmp_path = packed_path.with_name(f"{packed_path.name}.{os.getpid()}.tmp")
+    try:
+        raw = msgpack.packb(data) if msgpack else marshal.dumps(data)
+        tmp_path.write_bytes(raw)
+        os.replace(tmp_path, packed_path)
+    except (OSError, ValueError, TypeError):
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+
+
+def _load_packed_index(json_mtime_ns: int) -> Optional[dict]:
+    """The packed index if it is at least as new as index.json, else None."""
+    packed_path = _packed_index_path()
+    try:
+        if os.stat(packed_path).st_mtime_ns < json_mtime_ns:
+            return None  # stale: index.json was rewritten without it
+        raw = packed_path.read_bytes()
+        data = msgpack.unpackb(raw) if msgpack else marshal.loads(raw)
+    except Exception:
+        return None  # missing, from another Python version, or corrupt
+    return data if isinstance(data, dict) else None
+
 
+def _read_index_file(st: Optional[os.stat_result] = None) -> Optional[dict]:
+    """
+    Load the cached index.json, memoized per process and via its packed
+    binary copy when fresh; None if unreadable.
+    """
     try:
-        return json.loads(INDEX_CACHE_PATH.read_text(encoding="utf-8"))
+        key = _index_key(st)
+        if _INDEX_MEMO.get("key") == key:
+            return _INDEX_MEMO["data"]
+        data = _load_packed_index(key[0])
+        if data is None:
+            data = _read_json(INDEX_CACHE_PATH)
+            _save_packed_index(data)
     except (json.JSONDecodeError, OSError):
         return None
+    _INDEX_MEMO.update(key=key, data=data)
+    return data
+
+
+def get_cached_index() -> Optional[dict]:
+    """
+    Load cached index.json if it exists and is not expired.
+    Expiry uses the file's own mtime (set when it is saved), so this needs
+    no cache-meta.json read. Returns the parsed JSON or None.
+    """
+    try:
+        st = os.stat(INDEX_CACHE_PATH)
+    except OSError:
+        return None
+
+    if time.time() - st.st_mtime > INDEX_TTL:
+        return None  # expired
+
+    return _read_index_file(st)
 
 
 def get_cached_index_fallback() -> Optional[dict]:
@@ -73,91 +165,125 @@ def get_cached_index_fallback() -> Optional[dict]:
     """
     if not INDEX_CACHE_PATH.exists():
         return None
-    try:
-        return json.loads(INDEX_CACHE_PATH.read_text(encoding="utf-8"))
-    except (json.JSONDecodeError, OSError):
-        return None
+    return _read_index_file()
 
 
-def save_index_cache(data: dict):
-    """Save index.json to cache with timestamp."""
+def get_index_source() -> dict:
+    """Where the cached index was fetched from (see SkillRegistry.index_source), or {}."""
+    return _load_meta().get("index", {}).get("source") or {}
+
+
+def save_index_cache(data: dict, source: Optional[dict] = None):
+    """Save index.json to cache with timestamp, and the registry source it came from."""
     ensure_cache_dirs()
     try:
-        INDEX_CACHE_PATH.write_text(
-            json.dumps(data, indent=2, ensure_ascii=False),
-            encoding="utf-8",
-        )
+        _write_json(INDEX_CACHE_PATH, data)
+        _save_packed_index(data)
+        _INDEX_MEMO.update(key=_index_key(), data=data)
         meta = _load_meta()
         meta["index"] = {
             "cached_at": time.time(),
             "version": data.get("version", "unknown"),
             "skills_count": data.get("skills_count", 0),
         }
+        if source:
+            meta["index"]["source"] = source
         _save_meta(meta)
     except OSError:
         pass
 
 
-# ---------- Skill Content Cache ----------
-
-def get_cached_skill(skill_name: str, expected_hash: Optional[str] = None) -> Optional[str]:
+def touch_index_cache(source: Optional[dict] = None):
     """
-    Load cached SKILL.md content for a given skill name.
-    If expected_hash is provided, validate against stored hash.
-    Returns content string or None.
+    Restart the cached index's TTL without rewriting it, for when the registry
+    reports it unchanged. The packed copy gets the same mtime so it stays
+    fresh; only the metadata's timestamp and source are rewritten.
     """
-    skill_dir = SKILLS_CACHE_DIR / skill_name
-    skill_path = skill_dir / "SKILL.md"
+    now_ns = time.time_ns()
+    try:
+        old_key = _index_key()
+        os.utime(INDEX_CACHE_PATH, ns=(now_ns, now_ns))
+    except OSError:
+        return
+    try:
+        os.utime(_packed_index_path(), ns=(now_ns, now_ns))
+    except OSError:
+        pass  # no packed copy: the next load parses index.json
+    if _INDEX_MEMO.get("key") == old_key:
+        _INDEX_MEMO["key"] = (now_ns, old_key[1])
+    meta = _load_meta()
+    meta.setdefault("index", {})["cached_at"] = now_ns / 1e9
+    if source:
+        meta["index"]["source"] = source
+    _save_meta(meta)
 
-    if not skill_path.exists():
-        return None
 
-    meta = _load_meta()
-    skill_meta = meta.get("skills", {}).get(skill_name, {})
+# ---------- Skill Content Cache ----------
+
+def _read_text(path: Path, max_chars: Optional[int] = None) -> str:
+    """Read a UTF-8 text file, stopping after max_chars characters if given."""
+    with path.open(encoding="utf-8") as f:
+        return f.read(-1 if max_chars is None else max_chars)
+
+
+def _skill_meta_path(skill_name: str) -> Path:
+    """Per-skill metadata, so saving one skill does not rewrite shared state."""
+    return SKILLS_CACHE_DIR / skill_name / ".meta.json"
 
-    # Check TTL
-    cached_at = skill_meta.get("cached_at", 0)
-    if time.time() - cached_at > SKILL_TTL:
-        # Expired, but still usable as fallback
+
+def _load_skill_meta(skill_name: str) -> dict:
+    """Load a skill's cache metadata, falling back to legacy cache-meta.json entries."""
+    try:
+        return _read_json(_skill_meta_path(skill_name))
+    except (json.JSONDecodeError, OSError):
         pass
+    return _load_meta().get("skills", {}).get(skill_name, {})
+
 
-    # Check hash if provided
-    if expected_hash and skill_meta.get("content_hash") != expected_hash:
-        return None  # hash mismatch, need re-download
+def get_cached_skill(
+    skill_name: str,
+    expected_hash: Optional[str] = None,
+    max_chars: Optional[int] = None,
+) -> Optional[str]:
+    """
+    Load cached SKILL.md content for a given skill name.
+    If expected_hash is provided, validate against stored hash.
+    If max_chars is provided, read at most that many characters.
+    Returns content string or None.
+    Skills past SKILL_TTL (by SKILL.md mtime) are still served; only a hash
+    mismatch forces a re-download.
+    """
+    # Check hash if provided, from metadata alone, before touching SKILL.md
+    if expected_hash and _load_skill_meta(skill_name).get("content_hash") != expected_hash:
+        return None  # hash mismatch (or not cached), need re-download
 
+    # A missing file surfaces as OSError from open(), so no separate exists() stat
     try:
-        return skill_path.read_text(encoding="utf-8")
+        return _read_text(SKILLS_CACHE_DIR / skill_name / "SKILL.md", max_chars)
     except OSError:
         return None
 
 
-def get_cached_skill_fallback(skill_name: str) -> Optional[str]:
-    """Load cached SKILL.md regardless of TTL/hash (offline fallback)."""
-    skill_path = SKILLS_CACHE_DIR / skill_name / "SKILL.md"
-    if not skill_path.exists():
-        return None
+def get_cached_skill_fallback(skill_name: str, max_chars: Optional[int] = None) -> Optional[str]:
+    """Load cached SKILL.md regardless of TTL/hash (offline fallback), up to max_chars."""
     try:
-        return skill_path.read_text(encoding="utf-8")
+        return _read_text(SKILLS_CACHE_DIR / skill_name / "SKILL.md", max_chars)
     except OSError:
         return None
 
 
 def save_skill_cache(skill_name: str, content: str, content_hash: str = ""):
-    """Save SKILL.md content to cache."""
+    """Save SKILL.md content to cache, with its hash in the skill's own meta file."""
     ensure_cache_dirs()
     skill_dir = SKILLS_CACHE_DIR / skill_name
     skill_dir.mkdir(parents=True, exist_ok=True)
 
     try:
-        (skill_dir / "SKILL.md").write_text(content, encoding="utf-8")
-        meta = _load_meta()
-        if "skills" not in meta:
-            meta["skills"] = {}
-        meta["skills"][skill_name] = {
+        (skill_dir / "SKILL.md").write_bytes(content.encode("utf-8"))
+        _write_json(_skill_meta_path(skill_name), {
             "cached_at": time.time(),
             "content_hash": content_hash,
-        }
-        _save_meta(meta)
+        })
     except OSError:
         pass
 
@@ -168,12 +294,18 @@ def get_cache_stats() -> dict:
     """Return cache statistics for debugging."""
     meta = _load_meta()
     index_info = meta.get("index", {})
-    skills_info = meta.get("skills", {})
+    # Skills recorded in legacy cache-meta.json plus those with per-skill meta files
+    skill_names = dict.fromkeys(meta.get("skills", {}))
+    if SKILLS_CACHE_DIR.exists():
+        with os.scandir(SKILLS_CACHE_DIR) as it:
+            for entry in sorted(it, key=lambda e: e.name):
+                if os.path.exists(os.path.join(entry.path, ".meta.json")):
+                    skill_names[entry.name] = None
 
     return {
         "index_cached": INDEX_CACHE_PATH.exists(),
         "index_cached_at": index_info.get("cached_at"),
         "index_version": index_info.get("version"),
-        "cached_skills_count": len(skills_info),
-        "cached_skill_names": list(skills_info.keys()),
+        "cached_skills_count": len(skill_names),
+        "cached_skill_names": list(skill_names),
     }
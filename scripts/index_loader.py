@@ -33,9 +33,15 @@ def load_index(registry: Optional[SkillRegistry] = None) -> Optional[dict]:
     try:
         fresh = registry.fetch_index()
         if fresh is not None:
-            cache_manager.save_index_cache(fresh)
-            if DEBUG:
-                print("[skill-router][debug] index fetched from registry and cached", file=sys.stderr)
+            if registry.index_not_modified:
+                # Cached copy is still current: just restart its TTL
+                cache_manager.touch_index_cache(source=registry.index_source)
+                if DEBUG:
+                    print("[skill-router][debug] index not modified, cache renewed", file=sys.stderr)
+            else:
+                cache_manager.save_index_cache(fresh, source=registry.index_source)
+                if DEBUG:
+                    print("[skill-router][debug] index fetched from registry and cached", file=sys.stderr)
             return fresh
     except Exception as e:
         if DEBUG:
@@ -9,6 +9,10 @@ import cache_manager
 from registry import SkillRegistry, GitHubRegistry, LocalRegistry
 from config import MAX_SKILL_CONTENT_CHARS, DEBUG, LOCAL_CLOUD_SKILLS_DIR
 
+# Cached SKILL.md reads stop here; one char past the cap is enough for
+# format_injection to see the overflow and mark the content as truncated
+_CACHE_READ_CHARS = MAX_SKILL_CONTENT_CHARS + 1
+
 
 def load_skill_content(
     skill: dict,
@@ -17,13 +21,14 @@ def load_skill_content(
     """
     Load SKILL.md content for a matched skill.
     Uses cache with hash validation, falls back to registry fetch.
+    Cached content is read only up to what format_injection keeps.
     """
     skill_name = skill["name"]
     skill_path = skill.get("path", "")
     content_hash = skill.get("content_hash", "")
 
     # Try cache (hash-validated)
-    cached = cache_manager.get_cached_skill(skill_name, content_hash)
+    cached = cache_manager.get_cached_skill(skill_name, content_hash, _CACHE_READ_CHARS)
     if cached is not None:
         if DEBUG:
             print(f"[skill-router][debug] skill '{skill_name}' loaded from cache", file=sys.stderr)
@@ -45,7 +50,7 @@ def load_skill_content(
             print(f"[skill-router][debug] skill fetch failed: {e}", file=sys.stderr)
 
     # Fallback: expired cache
-    fallback = cache_manager.get_cached_skill_fallback(skill_name)
+    fallback = cache_manager.get_cached_skill_fallback(skill_name, _CACHE_READ_CHARS)
     if fallback is not None:
         if DEBUG:
             print(f"[skill-router][debug] skill '{skill_name}' loaded from expired cache", file=sys.stderr)
@@ -4,7 +4,22 @@ Pure text processing, no LLM calls. Bilingual (EN/ZH) support.
 """
 
 import re
-from typing import Dict, List, Optional, Tuple
+import sys
+from collections import OrderedDict
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Pattern, Tuple
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# RE2 (linear-time, no backtracking) when installed, else the stdlib engine;
+# only for the fixed tokenizer pattern, since intent_patterns may use
+# lookarounds or backreferences that RE2 does not support
+try:
+    import re2 as _re_engine
+except ImportError:
+    _re_engine = re
 
 from config import (
     WEIGHT_TRIGGER_KEYWORDS,
@@ -16,25 +31,46 @@ from config import (
 )
 
 
+_ZH_CHAR_RE = re.compile('[\u4e00-\u9fff]')
+_EN_CHAR_RE = re.compile('[A-Za-z]')
+
+
 def detect_language(text: str) -> str:
     """Detect if text contains Chinese characters. Returns 'zh', 'en', or 'both'."""
-    has_zh = False
-    has_en = False
-    for ch in text:
-        if '\u4e00' <= ch <= '\u9fff':
-            has_zh = True
-        elif ch.isascii() and ch.isalpha():
-            has_en = True
-        if has_zh and has_en:
-            return "both"
-    if has_zh:
-        return "zh"
+    # Each search stops at its first hit, scanning in C rather than per char
+    if _ZH_CHAR_RE.search(text):
+        return "both" if _EN_CHAR_RE.search(text) else "zh"
     return "en"
 
 
+_TOKEN_RE = _re_engine.compile(r'[a-z][a-z0-9\-]*')
+
+
 def tokenize_en(text: str) -> List[str]:
-    """Tokenize English text into lowercase words."""
-    return re.findall(r'[a-z][a-z0-9\-]*', text.lower())
+    """
+    Tokenize English text into lowercase words. Tokens are interned, so
+    prompt and skill words compare by identity in set lookups.
+    """
+    return _tokenize_lower(text.lower())
+
+
+def _tokenize_lower(lower: str) -> List[str]:
+    """tokenize_en for text that is already lowercase."""
+    return [sys.intern(tok) for tok in _TOKEN_RE.findall(lower)]
+
+
+# Common words ignored when comparing prompts with skill descriptions
+_STOP_WORDS = frozenset({
+    "a", "an", "the", "is", "are", "was", "were", "be", "been",
+    "being", "have", "has", "had", "do", "does", "did", "will",
+    "would", "could", "should", "may", "might", "can", "shall",
+    "to", "of", "in", "for", "on", "with", "at", "by", "from",
+    "as", "into", "through", "during", "before", "after", "and",
+    "but", "or", "nor", "not", "so", "yet", "both", "either",
+    "neither", "each", "every", "all", "any", "few", "more",
+    "most", "other", "some", "such", "no", "only", "own", "same",
+    "than", "too", "very", "just", "that", "this", "it", "its",
+})
 
 
 def normalize(text: str) -> str:
@@ -42,55 +78,278 @@ def normalize(text: str) -> str:
     return re.sub(r'\s+', ' ', text.lower().strip())
 
 
-def _stem_match(word: str, keyword: str) -> bool:
-    """Simple prefix-based stem matching. 'accessible' matches 'accessibility' etc."""
-    if len(word) < 5 or len(keyword) < 5:
-        return word == keyword
-    # Both must be at least 6 chars and share 80% prefix of the shorter word
-    min_len = min(len(word), len(keyword))
-    prefix_len = max(5, min_len * 4 // 5)  # 80%, min 5
-    if prefix_len > min_len:
-        return False
-    return word[:prefix_len] == keyword[:prefix_len]
+class PreparedPrompt(NamedTuple):
+    """Prompt-level data shared by every skill's scoring (see prepare_prompt)."""
+    lower: str
+    words: FrozenSet[str]
+    lang: str
+    # Words with 6+ chars (the only stem-match candidates) by 5-char prefix
+    stem_index: Dict[str, Tuple[str, ...]]
+    content_words: FrozenSet[str]  # words minus _STOP_WORDS
+    content_stem_index: Dict[str, Tuple[str, ...]]  # stem_index minus _STOP_WORDS
+    # Filled in by match_skills for its skill list (None: work it out per skill).
+    # Trigger/negative keywords found in `lower`:
+    hits: Optional[FrozenSet[str]] = None
+    # English trigger keyword -> _en_trigger_outcome, for those that match:
+    trigger_outcomes: Optional[Dict[str, Tuple[float, Optional[float]]]] = None
+    # Tag -> _tag_outcome, for those that match:
+    tag_outcomes: Optional[Dict[str, Tuple[float, ...]]] = None
+
+
+def _keyword_hits(prepared: PreparedPrompt):
+    """
+    Container for `keyword in ...` tests against the prompt: the precomputed
+    hit set when available, else the lowercased prompt itself (substring test).
+    """
+    return prepared.lower if prepared.hits is None else prepared.hits
+
+
+def _build_stem_index(words) -> Dict[str, Tuple[str, ...]]:
+    buckets: Dict[str, List[str]] = {}
+    for w in words:
+        if len(w) >= 6:
+            buckets.setdefault(w[:5], []).append(w)
+    return {prefix: tuple(ws) for prefix, ws in buckets.items()}
+
+
+def _build_prepared(prompt: str, lang: str) -> PreparedPrompt:
+    lower = prompt.lower()  # the one lowercase copy, also used for tokenizing
+    words = frozenset(_tokenize_lower(lower))
+    content_words = words - _STOP_WORDS
+    return PreparedPrompt(
+        lower, words, lang, _build_stem_index(words),
+        content_words, _build_stem_index(content_words),
+    )
+
+
+def prepare_prompt(prompt: str) -> PreparedPrompt:
+    """Lowercase, tokenize and language-detect a prompt once for match_skills."""
+    return _build_prepared(prompt, detect_language(prompt))
+
+
+def _prepared(prompt: str, lang: str, prepared: Optional[PreparedPrompt]) -> PreparedPrompt:
+    """Return prepared, or build it for callers that score a single skill directly."""
+    if prepared is None:
+        prepared = _build_prepared(prompt, lang)
+    return prepared
+
+
+class _Keyword(NamedTuple):
+    """A trigger keyword or tag, lowercased and tokenized once."""
+    lower: str
+    words: FrozenSet[str]
+    tokens: Tuple[str, ...]
+
+
+class _CompiledSkill(NamedTuple):
+    """Per-skill data derived once from the skill's static index fields."""
+    intent: Dict[str, Tuple[Pattern, ...]]  # lang -> compiled intent_patterns
+    triggers: Dict[str, Tuple[_Keyword, ...]]  # lang -> trigger_keywords
+    neg_multi: Dict[str, Tuple[str, ...]]  # lang -> multi-word negative_keywords
+    neg_single: Dict[str, Tuple[str, ...]]  # lang -> single-word negative_keywords
+    tags: Tuple[_Keyword, ...]
+    desc_words: FrozenSet[str]  # short_description words minus _STOP_WORDS
+    # All of the above as lowercase sets, so one isdisjoint() against the
+    # prompt's hit sets can rule out a whole level for the skill
+    en_trigger_set: FrozenSet[str]
+    zh_trigger_set: FrozenSet[str]
+    neg_set: FrozenSet[str]
+    tag_set: FrozenSet[str]
+
+
+# Compiled data for skills scored one at a time through the level functions
+# (match_skills uses its scanner's own list instead): id(skill) ->
+# (skill, _CompiledSkill), least recently used first. The skill dict is kept in
+# the entry so its id cannot be reused by another dict while cached; skill
+# dicts are treated as read-only once they have been scored.
+_COMPILED_SKILLS: "OrderedDict[int, Tuple[dict, _CompiledSkill]]" = OrderedDict()
+_COMPILED_CACHE_SIZE = 2048
+
+
+def _compile_skill(skill: dict) -> _CompiledSkill:
+    intent = {}
+    for lng, pats in skill.get("intent_patterns", {}).items():
+        compiled = []
+        for pat in pats:
+            try:
+                compiled.append(re.compile(pat, re.IGNORECASE))
+            except re.error:
+                continue  # invalid patterns never match
+        intent[lng] = tuple(compiled)
+    triggers = {
+        lng: tuple(_keyword(kw) for kw in kws)
+        for lng, kws in skill.get("trigger_keywords", {}).items()
+    }
+    neg_multi = {}
+    neg_single = {}
+    for lng, kws in skill.get("negative_keywords", {}).items():
+        lowered = [kw.lower() for kw in kws]
+        neg_multi[lng] = tuple(kw for kw in lowered if len(kw.split()) >= 2)
+        neg_single[lng] = tuple(kw for kw in lowered if len(kw.split()) < 2)
+    tags = tuple(_keyword(tag) for tag in skill.get("tags") or ())
+    desc_words = frozenset(tokenize_en(skill.get("short_description") or "")) - _STOP_WORDS
+    return _CompiledSkill(
+        intent, triggers, neg_multi, neg_single, tags, desc_words,
+        en_trigger_set=frozenset(
+            kw.lower for lng, kws in triggers.items() if lng != "zh" for kw in kws
+        ),
+        zh_trigger_set=frozenset(kw.lower for kw in triggers.get("zh", ())),
+        neg_set=frozenset(
+            kw for kws in (*neg_multi.values(), *neg_single.values()) for kw in kws
+        ),
+        tag_set=frozenset(tag.lower for tag in tags),
+    )
+
+
+def _keyword(text: str) -> _Keyword:
+    lower = text.lower()
+    tokens = tuple(_tokenize_lower(lower))
+    return _Keyword(lower, frozenset(tokens), tokens)
+
+
+def _compiled(skill: dict) -> _CompiledSkill:
+    """Return the skill's precompiled data, building it on first use."""
+    key = id(skill)
+    entry = _COMPILED_SKILLS.get(key)
+    if entry is None or entry[0] is not skill:
+        entry = (skill, _compile_skill(skill))
+        _COMPILED_SKILLS[key] = entry
+        if len(_COMPILED_SKILLS) > _COMPILED_CACHE_SIZE:
+            _COMPILED_SKILLS.popitem(last=False)
+    else:
+        _COMPILED_SKILLS.move_to_end(key)
+    return entry[1]
+
+
+class _KeywordScanner:
+    """
+    Finds which of a skill list's trigger and negative keywords occur in a
+    prompt, in one pass over the distinct keywords rather than per skill.
+    Uses an Aho-Corasick automaton when pyahocorasick is installed.
+    Likewise scores each distinct English trigger keyword and tag once.
+    Also holds the list's compiled skill data, in skill order.
+    """
+
+    def __init__(self, skills: List[dict]):
+        keywords = set()
+        en_triggers = {}
+        tags = {}
+        self.compiled = tuple(map(_compile_skill, skills))
+        for compiled in self.compiled:
+            for lng, kws in compiled.triggers.items():
+                keywords.update(kw.lower for kw in kws)
+                if lng != "zh":
+                    en_triggers.update((kw.lower, kw) for kw in kws)
+            tags.update((tag.lower, tag) for tag in compiled.tags)
+            for kws in compiled.neg_multi.values():
+                keywords.update(kws)
+            for kws in compiled.neg_single.values():
+                keywords.update(kws)
+        self.keywords = tuple(keywords)
+        self.en_triggers = tuple(en_triggers.values())
+        self.tags = tuple(tags.values())
+        self.always = frozenset(kw for kw in keywords if not kw)  # "" is in every prompt
+        self.automaton = None
+        if ahocorasick is not None and keywords - self.always:
+            self.automaton = ahocorasick.Automaton()
+            for kw in keywords - self.always:
+                self.automaton.add_word(kw, kw)
+            self.automaton.make_automaton()
+
+    def scan(self, text: str) -> FrozenSet[str]:
+        if self.automaton is not None:
+            return self.always.union(kw for _, kw in self.automaton.iter(text))
+        return frozenset(kw for kw in self.keywords if kw in text)
+
+    def prepare(self, prepared: PreparedPrompt) -> PreparedPrompt:
+        """
+        Fill in the prompt's keyword hits, and score each distinct English
+        trigger keyword and tag once, so skills sharing them just look up
+        the outcome.
+        """
+        prepared = prepared._replace(hits=self.scan(prepared.lower))
+        trigger_outcomes = {}
+        for kw in self.en_triggers:
+            outcome = _en_trigger_outcome(kw, prepared)
+            if outcome is not None:
+                trigger_outcomes[kw.lower] = outcome
+        tag_outcomes = {}
+        for tag in self.tags:
+            outcome = _tag_outcome(tag, prepared)
+            if outcome:
+                tag_outcomes[tag.lower] = outcome
+        return prepared._replace(trigger_outcomes=trigger_outcomes, tag_outcomes=tag_outcomes)
+
+
+# The scanner for the skill list last passed to match_skills, keyed by the
+# skills' ids (the list is kept so those ids stay valid)
+_SCANNER: dict = {}
+
+
+def _scanner_for(skills: List[dict]) -> _KeywordScanner:
+    key = tuple(map(id, skills))
+    if _SCANNER.get("key") != key:
+        _SCANNER.update(key=key, skills=list(skills), scanner=_KeywordScanner(skills))
+    return _SCANNER["scanner"]
+
+
+def _has_stem_match(stem_index: Dict[str, Tuple[str, ...]], keyword: str) -> bool:
+    """
+    Simple prefix-based stem matching: True if any indexed prompt word shares
+    an 80% prefix (of the shorter word, min 5 chars) with keyword (6+ chars),
+    so 'accessible' matches 'accessibility' etc. Such words share at least
+    their first 5 chars, so only that prefix's bucket needs checking, and
+    within it only chars past the 5th need comparing.
+    """
+    for pw in stem_index.get(keyword[:5], ()):
+        prefix_len = min(len(pw), len(keyword)) * 4 // 5
+        if prefix_len <= 5 or pw[:prefix_len] == keyword[:prefix_len]:
+            return True
+    return False
 
 
 # ---------- Level 1: Negative Keyword Exclusion ----------
 
-def check_negative_keywords(prompt: str, skill: dict, lang: str) -> bool:
+def check_negative_keywords(
+    prompt: str, skill: dict, lang: str, prepared: Optional[PreparedPrompt] = None,
+) -> bool:
     """
     Return True if skill should be EXCLUDED.
     Requires 2+ negative keyword hits for single-word keywords,
     or 1 hit for multi-word negative keywords (more specific = stronger signal).
     """
-    neg = skill.get("negative_keywords", {})
-    prompt_lower = prompt.lower()
+    return _is_excluded(_compiled(skill), _prepared(prompt, lang, prepared), _langs_for(lang))
 
-    hits_single = 0
-    hits_multi = 0
 
-    langs_to_check = _langs_for(lang)
-    for lng in langs_to_check:
-        for kw in neg.get(lng, []):
-            kw_lower = kw.lower()
-            if kw_lower in prompt_lower:
-                word_count = len(kw_lower.split())
-                if word_count >= 2:
-                    hits_multi += 1
-                else:
-                    hits_single += 1
+def _is_excluded(
+    compiled: _CompiledSkill, prepared: PreparedPrompt, langs_to_check: Tuple[str, ...],
+) -> bool:
+    if prepared.hits is not None and compiled.neg_set.isdisjoint(prepared.hits):
+        return False  # none of its negative keywords occur in the prompt
+    kw_hits = _keyword_hits(prepared)
 
     # Multi-word negative keyword is a strong signal (1 hit enough)
-    if hits_multi >= 1:
-        return True
+    for lng in langs_to_check:
+        for kw_lower in compiled.neg_multi.get(lng, ()):
+            if kw_lower in kw_hits:
+                return True
+
     # Single-word negative keywords need 2+ hits to exclude
-    if hits_single >= 2:
-        return True
+    hits_single = 0
+    for lng in langs_to_check:
+        for kw_lower in compiled.neg_single.get(lng, ()):
+            if kw_lower in kw_hits:
+                hits_single += 1
+                if hits_single >= 2:
+                    return True
     return False
 
 
 # ---------- Level 2: Trigger Keyword Matching (40%) ----------
 
-def score_trigger_keywords(prompt: str, skill: dict, lang: str) -> float:
+def score_trigger_keywords(
+    prompt: str, skill: dict, lang: str, prepared: Optional[PreparedPrompt] = None,
+) -> float:
     """
     Score based on trigger_keywords presence in prompt.
     Returns 0-100 raw score (will be weighted later).
@@ -98,41 +357,45 @@ def score_trigger_keywords(prompt: str, skill: dict, lang: str) -> float:
     Key insight: even 1 specific keyword match is a strong signal.
     Scoring: first match gives 40 base, each additional adds 15.
     """
-    trigger_kws = skill.get("trigger_keywords", {})
-    prompt_lower = prompt.lower()
-    prompt_words = set(tokenize_en(prompt))
+    return _trigger_score(_compiled(skill), _prepared(prompt, lang, prepared), _langs_for(lang))
+
+
+def _trigger_score(
+    compiled: _CompiledSkill, prepared: PreparedPrompt, langs_to_check: Tuple[str, ...],
+) -> float:
+    trigger_kws = compiled.triggers
+    kw_hits = _keyword_hits(prepared)
+    outcomes = prepared.trigger_outcomes
+    if (
+        outcomes is not None
+        and compiled.en_trigger_set.isdisjoint(outcomes)
+        and compiled.zh_trigger_set.isdisjoint(kw_hits)
+    ):
+        return 0.0  # none of its trigger keywords match
 
     matched = 0
     best_bonus = 0.0
 
-    langs_to_check = _langs_for(lang)
     for lng in langs_to_check:
-        kws = trigger_kws.get(lng, [])
+        kws = trigger_kws.get(lng, ())
         for kw in kws:
-            kw_lower = kw.lower()
+            kw_lower = kw.lower
             if lng == "zh":
                 # Chinese: direct substring match
-                if kw_lower in prompt_lower:
+                if kw_lower in kw_hits:
                     matched += 1
                     best_bonus = max(best_bonus, min(len(kw_lower) / 3, 15))
             else:
                 # English: word-boundary aware matching
-                kw_words = set(tokenize_en(kw_lower))
-                if kw_words and kw_words.issubset(prompt_words):
-                    # All keyword words appear as whole words → strong match
-                    matched += 1
-                    best_bonus = max(best_bonus, 10)
-                elif kw_lower in prompt_lower and len(kw_lower) >= 5:
-                    # Substring match only for longer keywords (avoid "aria" in "variable")
-                    matched += 0.7
+                if outcomes is not None:
+                    outcome = outcomes.get(kw_lower)
                 else:
-                    # Try stem matching for single-word keywords (6+ chars)
-                    kw_toks = tokenize_en(kw_lower)
-                    if len(kw_toks) == 1 and len(kw_toks[0]) >= 6:
-                        for pw in prompt_words:
-                            if len(pw) >= 6 and _stem_match(pw, kw_toks[0]):
-                                matched += 0.5
-                                break
+                    outcome = _en_trigger_outcome(kw, prepared)
+                if outcome is not None:
+                    increment, bonus = outcome
+                    matched += increment
+                    if bonus is not None:
+                        best_bonus = max(best_bonus, bonus)
 
     if matched == 0:
         return 0.0
@@ -142,33 +405,52 @@ def score_trigger_keywords(prompt: str, skill: dict, lang: str) -> float:
     return min(base + best_bonus, 100.0)
 
 
+def _en_trigger_outcome(
+    kw: _Keyword, prepared: PreparedPrompt,
+) -> Optional[Tuple[float, Optional[float]]]:
+    """(match increment, bonus or None) an English trigger keyword adds, or None."""
+    kw_words = kw.words
+    if kw_words and kw_words.issubset(prepared.words):
+        # All keyword words appear as whole words → strong match
+        return (1, 10)
+    kw_lower = kw.lower
+    if len(kw_lower) >= 5 and kw_lower in _keyword_hits(prepared):
+        # Substring match only for longer keywords (avoid "aria" in "variable")
+        return (0.7, None)
+    # Try stem matching for single-word keywords (6+ chars)
+    kw_toks = kw.tokens
+    if len(kw_toks) == 1 and len(kw_toks[0]) >= 6:
+        if _has_stem_match(prepared.stem_index, kw_toks[0]):
+            return (0.5, None)
+    return None
+
+
 # ---------- Level 3: Intent Pattern Matching (35%) ----------
 
-def score_intent_patterns(prompt: str, skill: dict, lang: str) -> float:
+def score_intent_patterns(
+    prompt: str, skill: dict, lang: str, prepared: Optional[PreparedPrompt] = None,
+) -> float:
     """
     Score based on regex intent_patterns matching.
     Any match gives high score; more matches = higher.
     Returns 0-100 raw score.
     """
-    patterns = skill.get("intent_patterns", {})
-    prompt_lower = prompt.lower()
+    return _intent_score(_compiled(skill), _prepared(prompt, lang, prepared), _langs_for(lang))
+
+
+def _intent_score(
+    compiled: _CompiledSkill, prepared: PreparedPrompt, langs_to_check: Tuple[str, ...],
+) -> float:
+    patterns = compiled.intent
+    prompt_lower = prepared.lower
 
     matched = 0
-    total = 0
 
-    langs_to_check = _langs_for(lang)
     for lng in langs_to_check:
-        pats = patterns.get(lng, [])
-        for pat in pats:
-            total += 1
-            try:
-                if re.search(pat, prompt_lower, re.IGNORECASE):
-                    matched += 1
-            except re.error:
-                continue
+        for pat in patterns.get(lng, ()):
+            if pat.search(prompt_lower):
+                matched += 1
 
-    if total == 0:
-        return 0.0
     if matched == 0:
         return 0.0
     # First match gives 70, additional matches add up to 30 more
@@ -177,38 +459,33 @@ def score_intent_patterns(prompt: str, skill: dict, lang: str) -> float:
 
 # ---------- Level 4: Tag Overlap (15%) ----------
 
-def score_tag_overlap(prompt: str, skill: dict) -> float:
+def score_tag_overlap(
+    prompt: str, skill: dict, prepared: Optional[PreparedPrompt] = None,
+) -> float:
     """
     Score based on overlap between prompt words and skill tags.
     Returns 0-100 raw score.
     """
-    tags = skill.get("tags", [])
+    return _tag_score(_compiled(skill), _prepared(prompt, "", prepared))
+
+
+def _tag_score(compiled: _CompiledSkill, prepared: PreparedPrompt) -> float:
+    tags = compiled.tags
     if not tags:
         return 0.0
 
-    prompt_words = set(tokenize_en(prompt))
-    prompt_lower = prompt.lower()
+    outcomes = prepared.tag_outcomes
+    if outcomes is not None and compiled.tag_set.isdisjoint(outcomes):
+        return 0.0  # none of its tags match
 
     matched = 0
     for tag in tags:
-        tag_lower = tag.lower()
-        # Check as substring (only for tags >= 5 chars to avoid false matches)
-        if tag_lower in prompt_lower and len(tag_lower) >= 5:
-            matched += 1
+        if outcomes is not None:
+            increments = outcomes.get(tag.lower, ())
         else:
-            # Check individual words of the tag
-            tag_words = set(tokenize_en(tag_lower))
-            if tag_words and tag_words.issubset(prompt_words):
-                matched += 0.7
-            else:
-                # Stem matching for tags (conservative: only long words)
-                for tw in tokenize_en(tag_lower):
-                    if len(tw) < 6:
-                        continue
-                    for pw in prompt_words:
-                        if len(pw) >= 6 and _stem_match(pw, tw):
-                            matched += 0.3
-                            break
+            increments = _tag_outcome(tag, prepared)
+        for increment in increments:
+            matched += increment
 
     # Any tag match is meaningful
     if matched == 0:
@@ -216,69 +493,84 @@ def score_tag_overlap(prompt: str, skill: dict) -> float:
     return min((matched / len(tags)) * 120, 100.0)
 
 
+def _tag_outcome(tag: _Keyword, prepared: PreparedPrompt) -> Tuple[float, ...]:
+    """The increments (in order) a tag adds to the match count; () if none."""
+    tag_lower = tag.lower
+    # Check as substring (only for tags >= 5 chars to avoid false matches)
+    if tag_lower in prepared.lower and len(tag_lower) >= 5:
+        return (1,)
+    # Check individual words of the tag
+    tag_words = tag.words
+    if tag_words and tag_words.issubset(prepared.words):
+        return (0.7,)
+    # Stem matching for tags (conservative: only long words), against the
+    # prompt words sharing the token's 5-char prefix
+    stem_index = prepared.stem_index
+    increments = []
+    for tw in tag.tokens:
+        if len(tw) >= 6 and _has_stem_match(stem_index, tw):
+            increments.append(0.3)
+    return tuple(increments)
+
+
 # ---------- Level 5: Description Word Overlap (10%) ----------
 
-def score_description_overlap(prompt: str, skill: dict) -> float:
+def score_description_overlap(
+    prompt: str, skill: dict, prepared: Optional[PreparedPrompt] = None,
+) -> float:
     """
     Score based on word overlap between prompt and short_description.
     Returns 0-100 raw score.
     """
-    desc = skill.get("short_description", "")
-    if not desc:
-        return 0.0
+    return _description_score(_compiled(skill), _prepared(prompt, "", prepared))
 
-    prompt_words = set(tokenize_en(prompt))
-    desc_words = set(tokenize_en(desc))
-
-    # Remove common stop words
-    stop_words = {
-        "a", "an", "the", "is", "are", "was", "were", "be", "been",
-        "being", "have", "has", "had", "do", "does", "did", "will",
-        "would", "could", "should", "may", "might", "can", "shall",
-        "to", "of", "in", "for", "on", "with", "at", "by", "from",
-        "as", "into", "through", "during", "before", "after", "and",
-        "but", "or", "nor", "not", "so", "yet", "both", "either",
-        "neither", "each", "every", "all", "any", "few", "more",
-        "most", "other", "some", "such", "no", "only", "own", "same",
-        "than", "too", "very", "just", "that", "this", "it", "its",
-    }
-
-    prompt_words -= stop_words
-    desc_words -= stop_words
 
+def _description_score(compiled: _CompiledSkill, prepared: PreparedPrompt) -> float:
+    desc_words = compiled.desc_words
     if not desc_words:
         return 0.0
 
+    prompt_words = prepared.content_words
+    stem_index = prepared.content_stem_index
+
     # Exact + stem overlap (conservative stems)
     overlap = 0
     for dw in desc_words:
         if dw in prompt_words:
             overlap += 1
-        elif len(dw) >= 6:
-            for pw in prompt_words:
-                if len(pw) >= 6 and _stem_match(pw, dw):
-                    overlap += 0.5
-                    break
+            continue
+        if len(dw) < 6:
+            continue
+        for pw in stem_index.get(dw[:5], ()):
+            # _has_stem_match, inlined for this per-skill loop
+            prefix_len = min(len(pw), len(dw)) * 4 // 5
+            if prefix_len <= 5 or pw[:prefix_len] == dw[:prefix_len]:
+                overlap += 0.5
+                break
 
     return min((overlap / len(desc_words)) * 100, 100.0)
 
 
 # ---------- Main Matching Function ----------
 
-def compute_score(prompt: str, skill: dict, lang: str) -> float:
+def compute_score(
+    prompt: str, skill: dict, lang: str, prepared: Optional[PreparedPrompt] = None,
+) -> float:
     """
     Compute total weighted score for a skill against a prompt.
     Returns 0-100 score.
     """
+    prepared = _prepared(prompt, lang, prepared)
+
     # Level 1: Negative keyword exclusion
-    if check_negative_keywords(prompt, skill, lang):
+    if check_negative_keywords(prompt, skill, lang, prepared):
         return -1.0
 
     # Levels 2-5: Weighted scoring
-    s_trigger = score_trigger_keywords(prompt, skill, lang)
-    s_intent = score_intent_patterns(prompt, skill, lang)
-    s_tags = score_tag_overlap(prompt, skill)
-    s_desc = score_description_overlap(prompt, skill)
+    s_trigger = score_trigger_keywords(prompt, skill, lang, prepared)
+    s_intent = score_intent_patterns(prompt, skill, lang, prepared)
+    s_tags = score_tag_overlap(prompt, skill, prepared)
+    s_desc = score_description_overlap(prompt, skill, prepared)
 
     total = (
         s_trigger * WEIGHT_TRIGGER_KEYWORDS +
@@ -289,17 +581,65 @@ def compute_score(prompt: str, skill: dict, lang: str) -> float:
     return total
 
 
-def match_skills(prompt: str, skills: List[dict]) -> List[Tuple[dict, float]]:
+# Most each remaining level can still add, after trigger / intent / tag scoring.
+# _score_if_reachable stops once even these cannot lift a skill to threshold.
+_MAX_AFTER_TRIGGER = 100 * (WEIGHT_INTENT_PATTERNS + WEIGHT_TAG_OVERLAP + WEIGHT_DESCRIPTION_OVERLAP)
+_MAX_AFTER_INTENT = 100 * (WEIGHT_TAG_OVERLAP + WEIGHT_DESCRIPTION_OVERLAP)
+_MAX_AFTER_TAGS = 100 * WEIGHT_DESCRIPTION_OVERLAP
+# Slack for float rounding, so a skill is only skipped when it is clearly short
+_PRUNE_EPSILON = 1e-9
+
+
+def _score_if_reachable(
+    compiled: _CompiledSkill, prepared: PreparedPrompt, langs_to_check: Tuple[str, ...],
+    threshold: float,
+) -> Optional[float]:
+    """
+    compute_score, but returning None as soon as the skill provably cannot
+    reach threshold (each raw level score is at most 100). Calls the level
+    kernels directly with the skill's compiled data.
+    """
+    if _is_excluded(compiled, prepared, langs_to_check):
+        return -1.0
+
+    floor = threshold - _PRUNE_EPSILON
+    partial = _trigger_score(compiled, prepared, langs_to_check) * WEIGHT_TRIGGER_KEYWORDS
+    if partial + _MAX_AFTER_TRIGGER < floor:
+        return None
+    partial += _intent_score(compiled, prepared, langs_to_check) * WEIGHT_INTENT_PATTERNS
+    if partial + _MAX_AFTER_INTENT < floor:
+        return None
+    partial += _tag_score(compiled, prepared) * WEIGHT_TAG_OVERLAP
+    if partial + _MAX_AFTER_TAGS < floor:
+        return None
+    return partial + _description_score(compiled, prepared) * WEIGHT_DESCRIPTION_OVERLAP
+
+
+def match_skills(
+    prompt: str,
+    skills: List[dict],
+    prepared: Optional[PreparedPrompt] = None,
+    threshold: float = TRIGGER_THRESHOLD,
+) -> List[Tuple[dict, float]]:
     """
     Match prompt against all skills, return sorted list of (skill, score).
-    Only includes skills above TRIGGER_THRESHOLD.
+    Only includes skills at or above threshold (TRIGGER_THRESHOLD by default).
+    prepared: optional prepare_prompt(prompt) result, e.g. cached by the caller.
     """
-    lang = detect_language(prompt)
+    if prepared is None:
+        prepared = prepare_prompt(prompt)
+    scanner = _scanner_for(skills)
+    prepared = scanner.prepare(prepared)
+    langs_to_check = _langs_for(prepared.lang)
     results = []
 
-    for skill in skills:
-        score = compute_score(prompt, skill, lang)
-        if score >= TRIGGER_THRESHOLD:
+    # Scored serially on purpose: scoring is pure Python and re, which hold
+    # the GIL, so threads do not speed it up, and a process pool costs more to
+    # start than a hook run spends scoring. The eval scripts parallelize
+    # across prompts instead (run_eval --jobs, compare --workers).
+    for skill, compiled in zip(skills, scanner.compiled):
+        score = _score_if_reachable(compiled, prepared, langs_to_check, threshold)
+        if score is not None and score >= threshold:
             results.append((skill, score))
 
     # Sort by score descending
@@ -330,11 +670,11 @@ def select_best(
 
 # ---------- Helper ----------
 
-def _langs_for(lang: str) -> List[str]:
-    """Return list of language keys to check based on detected language."""
+def _langs_for(lang: str) -> Tuple[str, ...]:
+    """Return language keys to check based on detected language (constant tuples)."""
     if lang == "both":
-        return ["en", "zh"]
+        return ("en", "zh")
     elif lang == "zh":
-        return ["zh", "en"]  # check zh first, fallback to en
+        return ("zh", "en")  # check zh first, fallback to en
     else:
-        return ["en"]
+        return ("en",)
@@ -3,12 +3,22 @@ Data abstraction layer for skill registries.
 Provides GitHubRegistry (Phase 1) and LocalRegistry (dev/offline).
 """
 
+import http.client
 import json
+import mmap
+import os
+import urllib.parse
 import urllib.request
 import urllib.error
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+import cache_manager
 from config import (
     GITHUB_RAW_BASE,
     LOCAL_CLOUD_SKILLS_DIR,
@@ -19,6 +29,14 @@ from config import (
 class SkillRegistry(ABC):
     """Abstract base for skill data sources."""
 
+    # Where the last fetch_index() result came from (URL/path plus validators
+    # such as ETag or mtime); saved with the index cache so the next fetch
+    # can tell whether the source has changed
+    index_source: Optional[dict] = None
+    # True when the last fetch_index() found the source unchanged since the
+    # cached index was saved, and so returned the cached copy
+    index_not_modified: bool = False
+
     @abstractmethod
     def fetch_index(self) -> Optional[dict]:
         """Fetch the skill index. Returns parsed JSON or None."""
@@ -30,6 +48,12 @@ class SkillRegistry(ABC):
         ...
 
 
+# Idle keep-alive connections by (scheme, host), shared by GitHubRegistry
+# instances; the router makes separate ones for the index and SKILL.md
+_CONNECTIONS: Dict[Tuple[str, str], http.client.HTTPConnection] = {}
+_MAX_REDIRECTS = 5
+
+
 class GitHubRegistry(SkillRegistry):
     """
     Fetches skills from a GitHub public repository via raw.githubusercontent.com.
@@ -41,32 +65,133 @@ class GitHubRegistry(SkillRegistry):
         self.timeout = timeout
 
     def fetch_index(self) -> Optional[dict]:
+        """
+        Fetch index.json, as a conditional GET when the cached index came from
+        the same URL: on 304 Not Modified the cached copy is returned as is.
+        """
         url = f"{self.base_url}/index.json"
-        content = self._fetch_url(url)
-        if content is None:
+        self.index_not_modified = False
+        headers = {}
+        cached = None
+        source = cache_manager.get_index_source()
+        if source.get("source") == url:
+            if source.get("etag"):
+                headers["If-None-Match"] = source["etag"]
+            if source.get("last_modified"):
+                headers["If-Modified-Since"] = source["last_modified"]
+            if headers:
+                cached = cache_manager.get_cached_index_fallback()
+                if cached is None:
+                    headers = {}  # nothing to fall back on: fetch in full
+
+        try:
+            status, resp_headers, raw = self._get(url, headers)
+        except (http.client.HTTPException, OSError, ValueError) as e:
+            _debug_fetch_failed(url, e)
+            return None
+        if status == 304 and cached is not None:
+            self.index_source = source
+            self.index_not_modified = True
+            return cached
+        if not 200 <= status < 300:
+            _debug_fetch_failed(url, f"HTTP {status}")
             return None
+        etag = resp_headers.get("ETag")
+        last_modified = resp_headers.get("Last-Modified")
+
         try:
-            return json.loads(content)
-        except json.JSONDecodeError:
+            data = _parse_json(raw)
+        except ValueError:  # JSONDecodeError or invalid UTF-8
             return None
+        self.index_source = {"source": url, "etag": etag, "last_modified": last_modified}
+        return data
 
     def fetch_skill_content(self, skill_path: str) -> Optional[str]:
         url = f"{self.base_url}/{skill_path}"
         return self._fetch_url(url)
 
     def _fetch_url(self, url: str) -> Optional[str]:
+        raw = self._fetch_bytes(url)
+        if raw is None:
+            return None
         try:
-            req = urllib.request.Request(
-                url,
-                headers={"User-Agent": "skill-router/1.0"},
-            )
-            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
-                return resp.read().decode("utf-8")
-        except (urllib.error.URLError, urllib.error.HTTPError, OSError, ValueError) as e:
-            if DEBUG:
-                import sys
-                print(f"[skill-router][debug] fetch failed: {url} -> {e}", file=sys.stderr)
+            return raw.decode("utf-8")
+        except ValueError as e:
+            _debug_fetch_failed(url, e)
+            return None
+
+    def _fetch_bytes(self, url: str) -> Optional[bytes]:
+        try:
+            status, _, raw = self._get(url)
+        except (http.client.HTTPException, OSError, ValueError) as e:
+            _debug_fetch_failed(url, e)
             return None
+        if not 200 <= status < 300:
+            _debug_fetch_failed(url, f"HTTP {status}")
+            return None
+        return raw
+
+    def _get(self, url: str, headers: Optional[dict] = None) -> Tuple[int, http.client.HTTPMessage, bytes]:
+        """
+        GET url and return (status, headers, body), following redirects.
+        Uses a keep-alive connection shared per host (see _CONNECTIONS), so
+        the index and SKILL.md fetches of one run share a TLS handshake.
+        Behind a configured proxy it goes through urlopen instead.
+        """
+        headers = {"User-Agent": "skill-router/1.0", **(headers or {})}
+        for _ in range(_MAX_REDIRECTS + 1):
+            parts = urllib.parse.urlsplit(url)
+            if parts.scheme not in ("http", "https"):
+                raise ValueError(f"unsupported URL: {url}")
+            if urllib.request.getproxies().get(parts.scheme):
+                return self._get_via_urlopen(url, headers)
+
+            path = parts.path or "/"
+            if parts.query:
+                path += "?" + parts.query
+            status, resp_headers, body = self._request(parts, path, headers)
+            location = resp_headers.get("Location")
+            if status not in (301, 302, 303, 307, 308) or not location:
+                return status, resp_headers, body
+            url = urllib.parse.urljoin(url, location)
+        raise ValueError(f"too many redirects: {url}")
+
+    def _request(self, parts, path: str, headers: dict) -> Tuple[int, http.client.HTTPMessage, bytes]:
+        key = (parts.scheme, parts.netloc)
+        conn = _CONNECTIONS.pop(key, None)
+        reused = conn is not None
+        while True:
+            if conn is None:
+                conn_cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+                conn = conn_cls(parts.netloc, timeout=self.timeout)
+            try:
+                conn.request("GET", path, headers=headers)
+                resp = conn.getresponse()
+                body = resp.read()
+            except ConnectionError:  # includes http.client.RemoteDisconnected
+                conn.close()
+                if not reused:
+                    raise
+                # The server dropped the idle connection: retry once on a fresh one
+                conn = None
+                reused = False
+                continue
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                raise
+            if resp.will_close:
+                conn.close()
+            else:
+                _CONNECTIONS[key] = conn
+            return resp.status, resp.headers, body
+
+    def _get_via_urlopen(self, url: str, headers: dict) -> Tuple[int, http.client.HTTPMessage, bytes]:
+        req = urllib.request.Request(url, headers=headers)
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                return resp.status, resp.headers, resp.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers, b""
 
 
 class LocalRegistry(SkillRegistry):
@@ -79,13 +204,30 @@ class LocalRegistry(SkillRegistry):
         self.root = root or LOCAL_CLOUD_SKILLS_DIR
 
     def fetch_index(self) -> Optional[dict]:
+        """
+        Read index.json, reusing the cached index instead of re-parsing when
+        it was saved from this same file at its current mtime and size.
+        """
         index_path = self.root / "index.json"
-        if not index_path.exists():
+        self.index_not_modified = False
+        try:
+            st = os.stat(index_path)
+        except OSError:
             return None
+        source = {"source": str(index_path), "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+        if cache_manager.get_index_source() == source:
+            cached = cache_manager.get_cached_index_fallback()
+            if cached is not None:
+                self.index_source = source
+                self.index_not_modified = True
+                return cached
+
         try:
-            return json.loads(index_path.read_text(encoding="utf-8"))
-        except (json.JSONDecodeError, OSError):
+            data = _read_json_file(index_path)
+        except (ValueError, OSError):  # ValueError covers JSONDecodeError and bad UTF-8
             return None
+        self.index_source = source
+        return data
 
     def fetch_skill_content(self, skill_path: str) -> Optional[str]:
         full_path = self.root / skill_path
@@ -108,3 +250,30 @@ class APIRegistry(SkillRegistry):
 
     def fetch_skill_content(self, skill_path: str) -> Optional[str]:
         raise NotImplementedError("APIRegistry not yet implemented")
+
+
+def _parse_json(raw: bytes):
+    """
+    Parse UTF-8 JSON bytes straight, with no separate decode step (orjson
+    when installed). Raises ValueError on invalid JSON or UTF-8.
+    """
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+
+def _read_json_file(path) -> dict:
+    """
+    Parse a UTF-8 JSON file. With orjson the file is memory-mapped and parsed
+    in place, with no intermediate bytes copy; otherwise it is read whole.
+    """
+    if not orjson:
+        return json.loads(path.read_bytes())
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return orjson.loads(view)
+
+
+def _debug_fetch_failed(url: str, e):
+    if DEBUG:
+        import sys
+        print(f"[skill-router][debug] fetch failed: {url} -> {e}", file=sys.stderr)
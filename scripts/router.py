@@ -12,6 +12,11 @@ import sys
 import os
 import time
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Add scripts dir to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
@@ -25,12 +30,13 @@ def main():
     start_time = time.time()
 
     try:
-        # Read hook input from stdin (force UTF-8 for Windows compatibility)
-        raw = sys.stdin.buffer.read().decode("utf-8")
+        # Read hook input from stdin as UTF-8 bytes (Windows compatibility);
+        # both parsers take bytes directly, so no separate decode step
+        raw = sys.stdin.buffer.read()
         if not raw.strip():
             sys.exit(0)
 
-        hook_input = json.loads(raw)
+        hook_input = orjson.loads(raw) if orjson else json.loads(raw)
         prompt = hook_input.get("prompt", "")
 
         if not prompt or not prompt.strip():
@@ -85,7 +91,10 @@ def main():
 
         # Output the systemMessage (force UTF-8 for Windows compatibility)
         output = {"systemMessage": injection}
-        sys.stdout.buffer.write(json.dumps(output, ensure_ascii=False).encode("utf-8"))
+        if orjson:
+            sys.stdout.buffer.write(orjson.dumps(output))
+        else:
+            sys.stdout.buffer.write(json.dumps(output, ensure_ascii=False).encode("utf-8"))
 
         if DEBUG:
             elapsed = (time.time() - start_time) * 1000